@@ -0,0 +1,42 @@
+// Renders a precomputed "latest items" bundle (data/latest/*.json, written by
+// tools/update_feeds.py) into every element with a data-latest-bundle attribute.
+(function(){
+  function itemHtml(it){
+    const title = escapeHtml(it.title || "Press release");
+    const link = escapeHtml(it.link || "#");
+    const sum = escapeHtml((it.summary || "").slice(0, 200));
+    const when = fmtDate(it.published);
+    const site = escapeHtml(it.site_name || it.site_slug || "");
+    const siteUrl = `/publisher/${encodeURIComponent(it.site_slug || "")}/`;
+    // Other publishers that carried the same release (merged by tools/dedup.py)
+    const also = (it.alternates || [])
+      .map(a => `<a href="${escapeHtml(a.link || "#")}" target="_blank" rel="noopener">${escapeHtml(a.site_name || a.site_slug || "")}</a>`)
+      .join(", ");
+    return `
+      <div class="feed-item">
+        <a href="${link}" target="_blank" rel="noopener" class="feed-title">${title}</a>
+        ${sum ? `<a href="${link}" target="_blank" rel="noopener" class="feed-summary">${sum}${it.summary && it.summary.length > 200 ? "…" : ""}</a>` : ""}
+        <div class="feed-meta">
+          ${when ? `<span class="feed-date">📅 ${when}</span>` : ""}
+          ${site ? `<a href="${siteUrl}" class="feed-publisher">${site}</a>` : ""}
+          ${also ? `<span class="feed-alternates">Also on ${also}</span>` : ""}
+        </div>
+      </div>
+    `;
+  }
+
+  async function render(el){
+    try {
+      const bundle = await loadJson(el.dataset.latestBundle);
+      const limit = parseInt(el.dataset.limit || "10", 10);
+      const items = (bundle.items || []).slice(0, limit);
+      el.innerHTML = items.length
+        ? items.map(itemHtml).join("")
+        : '<div class="notice">No press releases available at the moment.</div>';
+    } catch(err){
+      el.innerHTML = '<div class="notice">Latest press releases could not be loaded.</div>';
+    }
+  }
+
+  qa("[data-latest-bundle]").forEach(render);
+})();
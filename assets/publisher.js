@@ -67,8 +67,8 @@
     box.innerHTML = itemsToShow.map((it, idx)=>{
       const title = escapeHtml(it.title || "Articol");
       const link = escapeHtml(it.link || "#");
-      const when = escapeHtml(it.published_human || "");
-      const source = it.source ? escapeHtml(it.source) : "";
+      const when = escapeHtml(it.published_human || fmtDate(it.published));
+      const source = (it.source || feed.source) ? escapeHtml(it.source || feed.source) : "";
       const sum = escapeHtml(it.summary || "").slice(0, 340);
       
       // Natural variation: First 2 items dofollow, rest have chance of nofollow
@@ -138,8 +138,8 @@
         nextBatch.forEach((it, idx) => {
           const title = escapeHtml(it.title || "Articol");
           const link = escapeHtml(it.link || "#");
-          const when = escapeHtml(it.published_human || "");
-          const source = it.source ? escapeHtml(it.source) : "";
+          const when = escapeHtml(it.published_human || fmtDate(it.published));
+          const source = (it.source || feed.source) ? escapeHtml(it.source || feed.source) : "";
           const sum = escapeHtml(it.summary || "").slice(0, 340);
           const useNofollow = Math.random() < 0.5;
           const relAttr = useNofollow ? "nofollow noopener" : "noopener";
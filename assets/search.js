@@ -0,0 +1,55 @@
+// Client for the static press-release search index in /data/search/
+// (written by tools/search_index.py). Only index.json, the term shards of the
+// query words and the doc buckets of the `limit` newest hits are downloaded.
+const ReleaseSearch = (function(){
+  const BASE = "/data/search";
+  const files = new Map();
+  let meta = null;
+
+  function fold(str){
+    // Same folding as the indexer: lower-case, strip diacritics (ș/ş -> s, ț/ţ -> t, ă/â -> a, î -> i)
+    return String(str || "").toLowerCase().normalize("NFKD").replace(/[\u0300-\u036f]/g, "");
+  }
+
+  function load(path){
+    if(!files.has(path)) files.set(path, loadJson(path).catch(() => ({})));
+    return files.get(path);
+  }
+
+  async function idsFor(word){
+    const shard = word.slice(0, meta.prefix_len);
+    const ids = new Set();
+    if(!meta.shards.includes(shard)) return ids;
+    const terms = await load(`${BASE}/terms/${shard}.json`);
+    // Prefix match, so "comunic" also finds "comunicat" and "comunicate"
+    for(const [term, deltas] of Object.entries(terms)){
+      if(!term.startsWith(word)) continue;
+      let id = 0;
+      for(const d of deltas){ id += d; ids.add(id); }
+    }
+    return ids;
+  }
+
+  async function search(query, limit = 20){
+    meta = meta || await loadJson(`${BASE}/index.json`);
+    const stop = new Set(meta.stopwords || []);
+    const words = [...new Set(fold(query).match(/[a-z0-9]+/g) || [])]
+      .filter(w => w.length >= meta.min_term && !stop.has(w));
+    if(!words.length) return [];
+
+    const sets = await Promise.all(words.map(idsFor));
+    sets.sort((a, b) => a.size - b.size);
+    // Changed feeds are re-indexed with higher ids, so the highest ids are the newest items
+    const hits = [...sets[0]].filter(id => sets.every(s => s.has(id))).sort((a, b) => b - a).slice(0, limit);
+
+    const buckets = [...new Set(hits.map(id => Math.floor(id / meta.doc_bucket)))];
+    const docs = Object.assign({}, ...await Promise.all(buckets.map(b => load(`${BASE}/docs/${b}.json`))));
+    return hits
+      .map(id => docs[id])
+      .filter(Boolean)
+      .map(([title, link, slug, published]) => ({title, link, slug, published}))
+      .sort((a, b) => String(b.published || "").localeCompare(String(a.published || "")));
+  }
+
+  return { search, fold };
+})();
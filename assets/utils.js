@@ -18,7 +18,8 @@ function fmtDate(s){
 }
 
 async function loadJson(url){
-  const r = await fetch(url, {cache:"no-store"});
+  // Revalidate instead of bypassing the cache: unchanged files come back as 304
+  const r = await fetch(url, {cache:"no-cache"});
   if(!r.ok) throw new Error(`Failed ${r.status} for ${url}`);
   return await r.json();
 }
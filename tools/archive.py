@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Persistent archive of every feed item we have ever fetched, in SQLite.
+
+data/feeds/<slug>.json only holds a feed's current window (MAX_ITEMS), so an
+item is gone from the cache once the publisher's feed moves past it. The
+archive keeps it: update_feeds.py upserts the items of every slug whose
+content changed, keyed by the normalized link (scheme/host lower-cased,
+fragment, tracking parameters and trailing slash dropped). Re-seeing an
+item updates its text and last_seen; published is only filled in, never
+cleared.
+
+Lookups by publisher or category go through the (slug, published) and
+(category, published) indexes; see latest(), which update_feeds.py uses to
+keep the data/latest/ category bundles full when a publisher's feed window
+is short. The database is not committed (it is binary and only grows); the
+workflow keeps it in the Actions cache.
+
+Usage: python tools/archive.py [--backfill] [--stats]
+"""
+from __future__ import annotations
+
+import argparse
+import glob
+import json
+import os
+import sqlite3
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from catalog import DEFAULT_CATEGORY, LIGHT_FIELDS, SiteCatalog, load_catalog
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+ARCHIVE_DB = os.path.join(ROOT, "data", "archive.sqlite3")
+FEEDS_DIR = os.path.join(ROOT, "data", "feeds")
+
+TRACKING_PARAMS = ("utm_", "fbclid", "gclid", "mc_cid", "mc_eid")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS items (
+    key        TEXT PRIMARY KEY,
+    slug       TEXT NOT NULL,
+    category   TEXT,
+    kind       TEXT NOT NULL,          -- 'site' or 'social'
+    title      TEXT,
+    link       TEXT NOT NULL,
+    summary    TEXT,
+    published  TEXT,                   -- ISO 8601 UTC, NULL if undated
+    first_seen TEXT NOT NULL,
+    last_seen  TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS items_slug_published ON items (slug, published);
+CREATE INDEX IF NOT EXISTS items_category_published ON items (category, published);
+"""
+
+UPSERT = """
+INSERT INTO items (key, slug, category, kind, title, link, summary, published, first_seen, last_seen)
+VALUES (:key, :slug, :category, :kind, :title, :link, :summary, :published, :seen, :seen)
+ON CONFLICT (key) DO UPDATE SET
+    slug = excluded.slug,
+    category = excluded.category,
+    title = excluded.title,
+    summary = excluded.summary,
+    published = COALESCE(excluded.published, items.published),
+    last_seen = excluded.last_seen
+"""
+
+def normalize_link(link: str) -> str:
+    """Dedup key for an item link."""
+    parts = urlsplit((link or "").strip())
+    query = [(k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+             if not k.lower().startswith(TRACKING_PARAMS)]
+    path = parts.path.rstrip("/") or "/"
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), path, urlencode(query), ""))
+
+class Archive:
+    """Thin wrapper around the archive database."""
+
+    def __init__(self, path: str = ARCHIVE_DB) -> None:
+        self.path = path
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.db = sqlite3.connect(path)
+        self.db.row_factory = sqlite3.Row
+        self.db.executescript(SCHEMA)
+
+    def close(self) -> None:
+        self.db.close()
+
+    def __enter__(self) -> "Archive":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    def upsert(self, slug: str, category: Optional[str], kind: str, items: Iterable[Dict[str, Any]],
+               seen: Optional[str] = None) -> int:
+        """Insert or refresh `items` (feed JSON item dicts); returns how many had a link."""
+        seen = seen or datetime.now(timezone.utc).isoformat()
+        rows = [{
+            "key": normalize_link(i["link"]),
+            "slug": slug,
+            "category": category,
+            "kind": kind,
+            "title": i.get("title"),
+            "link": i["link"],
+            "summary": i.get("summary"),
+            "published": i.get("published"),
+            "seen": seen,
+        } for i in items if i.get("link")]
+        with self.db:
+            self.db.executemany(UPSERT, rows)
+        return len(rows)
+
+    def add_feed(self, site: Dict[str, Any], payload: Dict[str, Any], seen: Optional[str] = None) -> int:
+        """Archive the items and Mastodon posts of one data/feeds/<slug>.json payload."""
+        slug, category = site.get("slug"), site.get("category") or DEFAULT_CATEGORY
+        return (self.upsert(slug, category, "site", payload.get("items") or [], seen)
+                + self.upsert(slug, category, "social", payload.get("social") or [], seen))
+
+    def latest(self, slug: Optional[str] = None, category: Optional[str] = None, kind: str = "site",
+               limit: int = 20, before: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Newest items, optionally for one publisher or category and older than `before`."""
+        where, args = ["kind = ?", "published IS NOT NULL"], [kind]
+        if slug:
+            where.append("slug = ?")
+            args.append(slug)
+        if category:
+            where.append("category = ?")
+            args.append(category)
+        if before:
+            where.append("published < ?")
+            args.append(before)
+        sql = (f"SELECT slug, category, title, link, summary, published FROM items "
+               f"WHERE {' AND '.join(where)} ORDER BY published DESC LIMIT ?")
+        return [dict(r) for r in self.db.execute(sql, args + [limit])]
+
+    def count(self, slug: Optional[str] = None) -> int:
+        if slug:
+            return self.db.execute("SELECT COUNT(*) FROM items WHERE slug = ?", (slug,)).fetchone()[0]
+        return self.db.execute("SELECT COUNT(*) FROM items").fetchone()[0]
+
+def backfill(archive: Archive, catalog: SiteCatalog) -> int:
+    """Archive everything currently in data/feeds/."""
+    total = 0
+    for path in sorted(glob.glob(os.path.join(FEEDS_DIR, "*.json"))):
+        slug = os.path.basename(path)[:-len(".json")]
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                payload = json.load(f)
+        except (OSError, ValueError):
+            continue
+        total += archive.add_feed(catalog.get(slug) or {"slug": slug}, payload, payload.get("updated_at"))
+    return total
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description="Persistent SQLite archive of fetched feed items.")
+    ap.add_argument("--backfill", action="store_true", help="archive every item currently in data/feeds")
+    ap.add_argument("--stats", action="store_true", help="print item counts")
+    args = ap.parse_args(argv)
+
+    with Archive() as archive:
+        if args.backfill:
+            print(f"Archived {backfill(archive, load_catalog(fields=LIGHT_FIELDS))} items")
+        if args.stats or not args.backfill:
+            print(f"{archive.count()} items in {ARCHIVE_DB}")
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
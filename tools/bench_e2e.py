@@ -0,0 +1,378 @@
+#!/usr/bin/env python3
+"""
+End-to-end benchmark of the fetchers against a local fake-publisher server.
+
+No live site is contacted. A threaded HTTP server on 127.0.0.1 stands in for
+N publishers and serves WordPress-style RSS (and some Atom) synthesized from
+data/feeds/*.json, or recorded .xml feeds from --fixtures. Per publisher,
+chosen deterministically from --seed, it can add latency, fail with 5xx,
+hang past the client timeout, redirect the feed URL, or lack the primary
+feed so the fallback candidates are tried. Conditional requests get a 304
+when the ETag matches; between runs --change-rate of the feeds publish a new
+item.
+
+Publishers are spread over --hosts ports, because update_feeds.py limits
+concurrency per host (host:port), as real sites are spread over many
+hosts. Mastodon feeds share one port, like the instance most publishers use.
+
+Each tool runs in its own subprocess on a temporary copy of the data layout
+(the tool's module path constants point into it), first cold (no state),
+then warm (validators and caches from the cold run). Reported per run:
+wall time, requests by outcome, CPU time (user + sys) and peak RSS of the
+tool process.
+
+The tools' own timeouts are replaced by --client-timeout and
+generate_rss_feed's per-feed politeness delay by --rss-delay, so a run
+measures our code rather than sleeps. --time-budget is passed on to both
+tools, to see how much of the crawl a budget keeps.
+
+Usage: python tools/bench_e2e.py [--publishers 100 1000 10000] [--tools update_feeds generate_rss_feed]
+                                 [--latency S] [--error-rate R] [--timeout-rate R] [--json PATH]
+"""
+from __future__ import annotations
+
+import argparse
+import glob
+import hashlib
+import json
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlsplit
+
+from bench_feed_parser import cdata, wordpress_rss
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+FEEDS_DIR = os.path.join(ROOT, "data", "feeds")
+
+TOOLS = ("update_feeds", "generate_rss_feed")
+CATEGORIES = ("PR & Marketing", "Health", "News & Society", "Technology & Energy",
+              "Business", "Tourism & Delta", "Construction & Home", "Miscellaneous")
+
+class QuietServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128
+
+    def handle_error(self, request: Any, client_address: Any) -> None:
+        pass   # clients hanging up on a slow reply are part of the scenario
+
+class Behaviour:
+    """What the fake server does for one publisher."""
+
+    __slots__ = ("latency", "fault", "atom", "changes")
+
+    def __init__(self, slug: str, args: argparse.Namespace) -> None:
+        rng = random.Random(f"{args.seed}:{slug}")
+        self.latency = max(0.0, rng.gauss(args.latency, args.jitter))
+        roll = rng.random()
+        faults = (("error", args.error_rate), ("timeout", args.timeout_rate),
+                  ("redirect", args.redirect_rate), ("fallback", args.fallback_rate))
+        self.fault = "ok"
+        for name, rate in faults:
+            if roll < rate:
+                self.fault = name
+                break
+            roll -= rate
+        self.atom = rng.random() < args.atom_rate
+        self.changes = rng.random() < args.change_rate
+
+class FakePublishers:
+    """Shared state of the fake-publisher server ports."""
+
+    def __init__(self, args: argparse.Namespace, templates: List[Dict[str, Any]], fixtures: List[bytes]) -> None:
+        self.args = args
+        self.templates = templates
+        self.fixtures = fixtures
+        self.generation = 0
+        self.counts: Dict[str, int] = {}
+        self.lock = threading.Lock()
+        self.servers: List[QuietServer] = []
+        self._behaviour: Dict[str, Behaviour] = {}
+
+    def behaviour(self, slug: str) -> Behaviour:
+        b = self._behaviour.get(slug)
+        if b is None:
+            b = self._behaviour[slug] = Behaviour(slug, self.args)
+        return b
+
+    def count(self, outcome: str) -> None:
+        with self.lock:
+            self.counts[outcome] = self.counts.get(outcome, 0) + 1
+
+    def snapshot(self) -> Dict[str, int]:
+        with self.lock:
+            return dict(self.counts)
+
+    def start(self, ports: int) -> List[int]:
+        publishers = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self) -> None:
+                publishers.handle(self)
+
+            def log_message(self, *args: Any) -> None:
+                pass
+
+        for _ in range(ports):
+            server = QuietServer(("127.0.0.1", 0), Handler)
+            threading.Thread(target=server.serve_forever, daemon=True).start()
+            self.servers.append(server)
+        return [s.server_address[1] for s in self.servers]
+
+    def stop(self) -> None:
+        for server in self.servers:
+            server.shutdown()
+            server.server_close()
+
+    def body(self, slug: str, index: int, atom: bool, social: bool) -> bytes:
+        """Feed document for `slug`; changing feeds gain an item per generation."""
+        if self.fixtures:
+            return self.fixtures[index % len(self.fixtures)]
+        template = self.templates[index % len(self.templates)]
+        items = [dict(it, link=f"https://{slug}.example/{n}/{os.path.basename(it['link'].rstrip('/'))}/")
+                 for n, it in enumerate(template["items"])]
+        if self.behaviour(slug).changes and self.generation:
+            stamp = datetime(2026, 1, 1, tzinfo=timezone.utc) + timedelta(hours=self.generation)
+            items.insert(0, {"title": f"Comunicat nou {self.generation}", "summary": items[0]["summary"],
+                             "link": f"https://{slug}.example/new/{self.generation}/",
+                             "published": stamp.isoformat()})
+        payload = {"site": {"name": slug, "url": f"https://{slug}.example/"}, "items": items[:12]}
+        if social:
+            payload["items"] = [dict(it, title="", summary=it["summary"][:300]) for it in payload["items"]]
+        return atom_feed(payload) if atom else wordpress_rss(payload)
+
+    def handle(self, req: BaseHTTPRequestHandler) -> None:
+        parts = urlsplit(req.path)
+        segments = [s for s in parts.path.split("/") if s]
+        if len(segments) < 2 or segments[0] not in ("p", "m"):
+            return self.reply(req, 404, b"", "4xx")
+        slug, rest = segments[1].replace(".rss", ""), "/".join(segments[2:])
+        index = int(slug.rsplit("-", 1)[-1])
+        b = self.behaviour(slug)
+        time.sleep(b.latency)
+
+        if segments[0] == "m":
+            return self.feed(req, self.body(slug, index, False, True))
+        if b.fault == "error":
+            return self.reply(req, 503, b"", "5xx")
+        if b.fault == "timeout":
+            # Counted now: the client is gone before the reply
+            self.count("timeout")
+            time.sleep(self.args.client_timeout + 0.5)
+            return self.reply(req, 504, b"", None)
+        if b.fault == "redirect" and rest == "feed":
+            return self.reply(req, 301, b"", "3xx", {"Location": f"/p/{slug}/wp/feed/"})
+        if b.fault == "fallback" and rest == "feed":
+            return self.reply(req, 404, b"", "4xx")
+        if rest in ("feed", "wp/feed", "feed/rss", "feed/atom") or (rest == "" and "feed=" in parts.query):
+            return self.feed(req, self.body(slug, index, b.atom or rest == "feed/atom", False))
+        return self.reply(req, 404, b"", "4xx")
+
+    def feed(self, req: BaseHTTPRequestHandler, body: bytes) -> None:
+        etag = '"%s"' % hashlib.sha1(body).hexdigest()[:16]
+        if req.headers.get("If-None-Match") == etag:
+            return self.reply(req, 304, b"", "304", {"ETag": etag})
+        return self.reply(req, 200, body, "2xx", {"ETag": etag, "Content-Type": "application/rss+xml; charset=UTF-8"})
+
+    def reply(self, req: BaseHTTPRequestHandler, status: int, body: bytes, outcome: Optional[str],
+              headers: Optional[Dict[str, str]] = None) -> None:
+        if outcome:
+            self.count(outcome)
+        try:
+            req.send_response(status)
+            for k, v in (headers or {}).items():
+                req.send_header(k, v)
+            req.send_header("Content-Length", str(len(body)))
+            req.end_headers()
+            req.wfile.write(body)
+        except OSError:
+            pass   # the client gave up (timeout)
+
+def atom_feed(payload: Dict[str, Any]) -> bytes:
+    site = payload["site"]
+    out = ['<?xml version="1.0" encoding="UTF-8"?>',
+           '<feed xmlns="http://www.w3.org/2005/Atom" xml:lang="ro-RO">',
+           f"<title>{cdata(site['name'])}</title>",
+           f'<link rel="alternate" type="text/html" href="{site["url"]}"/>',
+           f"<id>{site['url']}</id>",
+           f"<updated>{max((i.get('published') or '' for i in payload['items']), default='')}</updated>"]
+    for it in payload["items"]:
+        out += ["<entry>",
+                f'<title type="html">{cdata(it.get("title") or "")}</title>',
+                f'<link rel="alternate" type="text/html" href="{it["link"]}"/>',
+                f"<id>{it['link']}</id>",
+                f"<published>{it.get('published') or ''}</published>",
+                f"<updated>{it.get('published') or ''}</updated>",
+                f'<summary type="html">{cdata(it.get("summary") or "")}</summary>',
+                "</entry>"]
+    out.append("</feed>")
+    return "\n".join(out).encode("utf-8")
+
+def load_templates() -> List[Dict[str, Any]]:
+    templates = []
+    for path in sorted(glob.glob(os.path.join(FEEDS_DIR, "*.json"))):
+        with open(path, "r", encoding="utf-8") as f:
+            payload = json.load(f)
+        items = [i for i in payload.get("items") or [] if i.get("link")]
+        if items:
+            templates.append({"items": items})
+    if not templates:
+        now = datetime.now(timezone.utc)
+        templates.append({"items": [{"title": f"Comunicat {n}", "summary": "Text comunicat de presă. " * 20,
+                                     "link": f"https://example.ro/{n}/",
+                                     "published": (now - timedelta(hours=n)).isoformat()} for n in range(12)]})
+    return templates
+
+def load_fixtures(directory: str) -> List[bytes]:
+    fixtures = []
+    for path in sorted(glob.glob(os.path.join(directory, "*.xml"))) if directory else []:
+        with open(path, "rb") as f:
+            fixtures.append(f.read())
+    return fixtures
+
+def make_sites(n: int, ports: List[int], mastodon_port: int, mastodon_rate: float, seed: int) -> Dict[str, Any]:
+    rng = random.Random(seed)
+    sites = []
+    for i in range(n):
+        slug = f"pub-{i}"
+        base = f"http://127.0.0.1:{ports[i % len(ports)]}/p/{slug}"
+        site = {"slug": slug, "name": f"Publisher {i}", "url": base + "/", "rss": base + "/feed/",
+                "category": CATEGORIES[i % len(CATEGORIES)]}
+        if rng.random() < mastodon_rate:
+            site["mastodon"] = f"http://127.0.0.1:{mastodon_port}/m/{slug}"
+            site["mastodon_rss"] = site["mastodon"] + ".rss"
+        sites.append(site)
+    return {"base_url": "https://example.ro", "sites": sites}
+
+# -- child side: run one tool on a temporary data layout ----------------------
+
+def run_child(tool: str, workdir: str, client_timeout: float, rss_delay: float,
+              time_budget: Optional[float]) -> None:
+    from pathlib import Path
+    with open(os.path.join(workdir, "sites.json"), "r", encoding="utf-8") as f:
+        data = json.load(f)
+    sys.stdout = open(os.path.join(workdir, f"{tool}.log"), "a", encoding="utf-8")
+    import fetch_metrics
+    fetch_metrics.METRICS_JSON = os.path.join(workdir, "metrics.json")
+    fetch_metrics.METRICS_PROM = os.path.join(workdir, "metrics.prom")
+    fetch_metrics.HEALTH_HTML = os.path.join(workdir, "health", "index.html")
+    import response_store
+    response_store.STORE_DIR = os.path.join(workdir, "responses")
+    if tool == "update_feeds":
+        import update_feeds
+        update_feeds.SITES_JSON = os.path.join(workdir, "sites.json")
+        update_feeds.OUT_DIR = os.path.join(workdir, "feeds")
+        update_feeds.STATE_JSON = os.path.join(workdir, "feed_state.json")
+        update_feeds.MANIFEST_JSON = os.path.join(workdir, "feeds-manifest.json")
+        update_feeds.LATEST_DIR = os.path.join(workdir, "latest")
+        update_feeds.TIMEOUT = update_feeds.CONNECT_TIMEOUT = client_timeout
+        update_feeds.main(["--force", "--archive", os.path.join(workdir, "archive.sqlite3"),
+                           "--store", response_store.STORE_DIR]
+                          + (["--time-budget", str(time_budget)] if time_budget else []), data=data)
+    else:
+        import generate_rss_feed
+        generate_rss_feed.OUTPUT_FILE = Path(workdir) / "feed.xml"
+        generate_rss_feed.STATE_JSON = Path(workdir) / "rss_feed_state.json"
+        generate_rss_feed.FEEDS_DIR = Path(workdir) / "feeds"
+        generate_rss_feed.REQUEST_TIMEOUT = client_timeout
+        generate_rss_feed.REQUEST_DELAY = rss_delay
+        generate_rss_feed.generate_rss_feed(offline=False, data=data, time_budget=time_budget)
+
+# -- parent side ---------------------------------------------------------------
+
+def measure(tool: str, workdir: str, args: argparse.Namespace) -> Dict[str, float]:
+    """Run `tool` in a subprocess; wall, CPU and peak RSS of that process."""
+    cmd = [sys.executable, os.path.abspath(__file__), "--child", tool, workdir,
+           "--client-timeout", str(args.client_timeout), "--rss-delay", str(args.rss_delay)]
+    if args.time_budget:
+        cmd += ["--time-budget", str(args.time_budget)]
+    start = time.perf_counter()
+    proc = subprocess.Popen(cmd, cwd=os.path.dirname(os.path.abspath(__file__)))
+    _, status, usage = os.wait4(proc.pid, 0)
+    wall = time.perf_counter() - start
+    proc.returncode = os.waitstatus_to_exitcode(status)
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    rss = usage.ru_maxrss / (1024 * 1024 if sys.platform == "darwin" else 1024)
+    return {"wall_s": wall, "cpu_s": usage.ru_utime + usage.ru_stime, "peak_rss_mib": rss,
+            "exit": proc.returncode}
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description="End-to-end fetcher benchmark against a fake-publisher server.")
+    ap.add_argument("--publishers", type=int, nargs="+", default=[100, 1000, 10000])
+    ap.add_argument("--tools", nargs="+", choices=TOOLS, default=list(TOOLS))
+    ap.add_argument("--runs", type=int, default=2, help="runs per scale: cold, then warm (default 2)")
+    ap.add_argument("--hosts", type=int, default=32, help="server ports the publishers are spread over")
+    ap.add_argument("--latency", type=float, default=0.05, help="mean response latency, seconds")
+    ap.add_argument("--jitter", type=float, default=0.02, help="latency standard deviation, seconds")
+    ap.add_argument("--error-rate", type=float, default=0.03, help="publishers answering 5xx")
+    ap.add_argument("--timeout-rate", type=float, default=0.01, help="publishers hanging past the client timeout")
+    ap.add_argument("--redirect-rate", type=float, default=0.05, help="publishers redirecting their feed URL")
+    ap.add_argument("--fallback-rate", type=float, default=0.05, help="publishers without the primary feed URL")
+    ap.add_argument("--atom-rate", type=float, default=0.1, help="publishers serving Atom")
+    ap.add_argument("--mastodon-rate", type=float, default=0.3, help="publishers with a Mastodon feed")
+    ap.add_argument("--change-rate", type=float, default=0.2, help="feeds gaining an item between runs")
+    ap.add_argument("--client-timeout", type=float, default=2.0, help="replaces the tools' request timeouts")
+    ap.add_argument("--rss-delay", type=float, default=0.0, help="replaces generate_rss_feed.REQUEST_DELAY")
+    ap.add_argument("--time-budget", type=float, help="passed on to the tools (seconds)")
+    ap.add_argument("--fixtures", default="", help="directory of recorded .xml feeds to serve instead")
+    ap.add_argument("--seed", type=int, default=1)
+    ap.add_argument("--json", default="", help="also write the results to this file")
+    ap.add_argument("--keep", action="store_true", help="keep the temporary data directories")
+    ap.add_argument("--child", nargs=2, metavar=("TOOL", "WORKDIR"), help=argparse.SUPPRESS)
+    args = ap.parse_args(argv)
+
+    if args.child:
+        run_child(args.child[0], args.child[1], args.client_timeout, args.rss_delay, args.time_budget)
+        return 0
+
+    server = FakePublishers(args, load_templates(), load_fixtures(args.fixtures))
+    ports = server.start(args.hosts + 1)
+    results = []
+    print(f"{'publishers':>10} {'tool':<18} {'run':<5} {'wall s':>8} {'requests':>9} {'2xx':>6} {'304':>6} "
+          f"{'3xx':>5} {'4xx':>5} {'5xx':>5} {'t/o':>4} {'cpu s':>7} {'peak MiB':>9}")
+    try:
+        for n in args.publishers:
+            data = make_sites(n, ports[:-1], ports[-1], args.mastodon_rate, args.seed)
+            for tool in args.tools:
+                workdir = tempfile.mkdtemp(prefix=f"bench-e2e-{tool}-{n}-")
+                with open(os.path.join(workdir, "sites.json"), "w", encoding="utf-8") as f:
+                    json.dump(data, f)
+                for run in range(args.runs):
+                    server.generation = run
+                    before = server.snapshot()
+                    stats = measure(tool, workdir, args)
+                    after = server.snapshot()
+                    counts = {k: after.get(k, 0) - before.get(k, 0) for k in after}
+                    row = dict(stats, publishers=n, tool=tool, run="cold" if run == 0 else f"warm{run}",
+                               requests=sum(counts.values()), outcomes=counts)
+                    results.append(row)
+                    print(f"{n:>10} {tool:<18} {row['run']:<5} {stats['wall_s']:8.2f} {row['requests']:>9} "
+                          f"{counts.get('2xx', 0):>6} {counts.get('304', 0):>6} {counts.get('3xx', 0):>5} "
+                          f"{counts.get('4xx', 0):>5} {counts.get('5xx', 0):>5} {counts.get('timeout', 0):>4} "
+                          f"{stats['cpu_s']:7.2f} {stats['peak_rss_mib']:9.1f}"
+                          + (f"  exit {stats['exit']}" if stats["exit"] else ""), flush=True)
+                if args.keep:
+                    print(f"{'':>10} kept {workdir}")
+                else:
+                    shutil.rmtree(workdir, ignore_errors=True)
+    finally:
+        server.stop()
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"settings": {k: v for k, v in vars(args).items() if k not in ("child", "json")},
+                       "results": results}, f, indent=1)
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
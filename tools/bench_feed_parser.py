@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Benchmark the fast feed parser against the feedparser path.
+
+By default the fixture set is built from data/feeds/*.json: every cached
+publisher becomes a WordPress-style RSS 2.0 document (with content:encoded
+bodies), so the numbers reflect our real titles, summaries and dates. Pass a
+directory of recorded .xml feeds to benchmark those instead.
+
+For each fixture it measures CPU time of
+  - slow path: feedparser.parse() + entry_to_item()
+  - fast path: stream_entries() + element_to_item()
+and checks that both produce identical items.
+
+Usage: python tools/bench_feed_parser.py [FIXTURE_DIR] [--repeat N]
+"""
+from __future__ import annotations
+
+import argparse
+import glob
+import json
+import os
+import statistics
+import time
+from email.utils import format_datetime
+from datetime import datetime
+from typing import List, Tuple
+
+import feedparser
+
+from feed_parser import element_to_item, entry_to_item, stream_entries
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+FEEDS_DIR = os.path.join(ROOT, "data", "feeds")
+MAX_ITEMS = 12
+
+def cdata(s: str) -> str:
+    return "<![CDATA[" + s.replace("]]>", "]]]]><![CDATA[>") + "]]>"
+
+def wordpress_rss(payload: dict) -> bytes:
+    """Render a cached feed payload as the RSS 2.0 a WordPress site would serve."""
+    site = payload.get("site") or {}
+    out = ['<?xml version="1.0" encoding="UTF-8"?>',
+           '<rss version="2.0" xmlns:content="http://purl.org/rss/1.0/modules/content/" '
+           'xmlns:wfw="http://wellformedweb.org/CommentAPI/" xmlns:dc="http://purl.org/dc/elements/1.1/" '
+           'xmlns:atom="http://www.w3.org/2005/Atom" xmlns:sy="http://purl.org/rss/1.0/modules/syndication/">',
+           "<channel>",
+           f"<title>{cdata(site.get('name') or '')}</title>",
+           f"<link>{site.get('url') or ''}</link>",
+           "<description>Just another WordPress site</description>",
+           "<language>ro-RO</language>",
+           "<sy:updatePeriod>hourly</sy:updatePeriod>",
+           "<generator>https://wordpress.org/?v=6.5</generator>"]
+    for it in payload.get("items") or []:
+        try:
+            pub = format_datetime(datetime.fromisoformat(it["published"]))
+        except (KeyError, TypeError, ValueError):
+            pub = ""
+        summary = it.get("summary") or ""
+        body = "".join(f"<p>{summary}</p>\n" for _ in range(8))
+        out += ["<item>",
+                f"<title>{cdata(it.get('title') or '')}</title>",
+                f"<link>{it.get('link') or ''}</link>",
+                f"<comments>{it.get('link') or ''}#respond</comments>",
+                "<dc:creator><![CDATA[admin]]></dc:creator>",
+                f"<pubDate>{pub}</pubDate>",
+                "<category><![CDATA[Comunicate]]></category>",
+                f'<guid isPermaLink="false">{it.get("link") or ""}?p=1</guid>',
+                f"<description>{cdata(summary)}</description>",
+                f"<content:encoded>{cdata(body)}</content:encoded>",
+                "</item>"]
+    out += ["</channel>", "</rss>"]
+    return "\n".join(out).encode("utf-8")
+
+def load_fixtures(directory: str) -> List[Tuple[str, bytes]]:
+    if directory:
+        fixtures = []
+        for path in sorted(glob.glob(os.path.join(directory, "*.xml"))):
+            with open(path, "rb") as f:
+                fixtures.append((os.path.basename(path), f.read()))
+        return fixtures
+    fixtures = []
+    for path in sorted(glob.glob(os.path.join(FEEDS_DIR, "*.json"))):
+        with open(path, "r", encoding="utf-8") as f:
+            payload = json.load(f)
+        if payload.get("items"):
+            fixtures.append((os.path.basename(path), wordpress_rss(payload)))
+    return fixtures
+
+def slow_path(body: bytes) -> list:
+    return [entry_to_item(e, "bench") for e in feedparser.parse(body).entries[:MAX_ITEMS]]
+
+def fast_path(body: bytes) -> list:
+    return [element_to_item(e, "bench") for e in stream_entries([body], MAX_ITEMS).entries]
+
+def cpu_time(fn, body: bytes, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t = time.process_time()
+        fn(body)
+        best = min(best, time.process_time() - t)
+    return best
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Benchmark fast feed parser vs feedparser.")
+    ap.add_argument("fixtures", nargs="?", default="", help="directory of .xml feeds (default: synthesized from data/feeds)")
+    ap.add_argument("--repeat", type=int, default=5)
+    args = ap.parse_args()
+
+    fixtures = load_fixtures(args.fixtures)
+    if not fixtures:
+        print("No fixtures found")
+        return 1
+
+    slow_times, fast_times, mismatches = [], [], []
+    for name, body in fixtures:
+        if slow_path(body) != fast_path(body):
+            mismatches.append(name)
+        slow_times.append(cpu_time(slow_path, body, args.repeat))
+        fast_times.append(cpu_time(fast_path, body, args.repeat))
+
+    total_bytes = sum(len(b) for _, b in fixtures)
+    print(f"{len(fixtures)} fixtures, {total_bytes / 1024:.0f} KiB total")
+    print(f"feedparser : {statistics.median(slow_times) * 1000:8.2f} ms/feed median, {sum(slow_times):.3f} s total")
+    print(f"fast path  : {statistics.median(fast_times) * 1000:8.2f} ms/feed median, {sum(fast_times):.3f} s total")
+    print(f"CPU saving : {sum(slow_times) / max(sum(fast_times), 1e-9):.1f}x")
+    print(f"identical items: {len(fixtures) - len(mismatches)}/{len(fixtures)}")
+    for name in mismatches:
+        print(f"  differs: {name}")
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Benchmark the search index build and report shard sizes.
+
+The corpus is data/feeds/*.json, optionally replicated --scale times (each
+copy gets its own slugs and links) to size future growth. The index is built
+in a temporary directory, so data/search is not touched.
+
+Reported:
+  - full build, no-op update and one-changed-feed update wall times
+  - term shard and doc bucket counts and sizes (raw and gzip)
+  - bytes a browser downloads for a few sample queries
+
+Usage: python tools/bench_search_index.py [--scale N] [--query WORDS ...]
+"""
+from __future__ import annotations
+
+import argparse
+import gzip
+import os
+import statistics
+import tempfile
+import time
+from typing import Dict, List
+
+import search_index
+from search_index import SearchIndex, load_feeds, shard_of, tokenize
+
+SAMPLE_QUERIES = ["comunicat", "sanatate romania", "energie", "bucuresti afaceri", "turism delta"]
+
+def scaled_feeds(scale: int) -> Dict[str, List[dict]]:
+    base = load_feeds()
+    if scale <= 1:
+        return base
+    feeds = {}
+    for n in range(scale):
+        for slug, items in base.items():
+            feeds[f"{slug}-{n}"] = [dict(i, link=f"{i.get('link')}#{n}") for i in items]
+    return feeds
+
+def sizes(directory: str) -> List[int]:
+    if not os.path.isdir(directory):
+        return []
+    return [os.path.getsize(os.path.join(directory, f)) for f in os.listdir(directory)]
+
+def gzip_sizes(directory: str) -> List[int]:
+    out = []
+    for f in os.listdir(directory):
+        with open(os.path.join(directory, f), "rb") as fh:
+            out.append(len(gzip.compress(fh.read())))
+    return out
+
+def describe(label: str, raw: List[int], gz: List[int]) -> None:
+    if not raw:
+        print(f"{label:<12}: none")
+        return
+    raw_sorted = sorted(raw)
+    p95 = raw_sorted[int(len(raw_sorted) * 0.95) - 1] if len(raw_sorted) > 1 else raw_sorted[0]
+    print(f"{label:<12}: {len(raw):5d} files, {sum(raw) / 1024:8.1f} KiB total ({sum(gz) / 1024:.1f} KiB gzip), "
+          f"median {statistics.median(raw) / 1024:.1f} KiB, p95 {p95 / 1024:.1f} KiB, max {max(raw) / 1024:.1f} KiB")
+
+def query_bytes(directory: str, query: str, limit: int = 20) -> int:
+    """Bytes fetched for `query`: index.json, the term shards and the doc buckets of the `limit` newest hits."""
+    total = os.path.getsize(os.path.join(directory, "index.json"))
+    words = set(tokenize(query))
+    hits = None
+    for shard in {shard_of(w) for w in words}:
+        path = os.path.join(directory, "terms", f"{shard}.json")
+        if os.path.exists(path):
+            total += os.path.getsize(path)
+    for w in words:
+        terms = search_index._read(os.path.join(directory, "terms", f"{shard_of(w)}.json"))
+        ids = {i for t, d in terms.items() if t.startswith(w) for i in search_index.decode(d)}
+        hits = ids if hits is None else hits & ids
+    for bucket in {search_index.bucket_of(i) for i in sorted(hits or (), reverse=True)[:limit]}:
+        total += os.path.getsize(os.path.join(directory, "docs", f"{bucket}.json"))
+    return total
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Benchmark the sharded search index.")
+    ap.add_argument("--scale", type=int, default=1, help="replicate the feed cache N times")
+    ap.add_argument("--query", nargs="*", default=SAMPLE_QUERIES)
+    args = ap.parse_args()
+
+    feeds = scaled_feeds(args.scale)
+    items = sum(len(v) for v in feeds.values())
+    with tempfile.TemporaryDirectory() as directory:
+        t = time.perf_counter()
+        SearchIndex(directory).update(feeds)
+        full = time.perf_counter() - t
+
+        t = time.perf_counter()
+        SearchIndex(directory).update(feeds)
+        noop = time.perf_counter() - t
+
+        slug = sorted(feeds)[0]
+        feeds[slug] = feeds[slug][1:]
+        t = time.perf_counter()
+        stats = SearchIndex(directory).update(feeds)
+        one = time.perf_counter() - t
+
+        print(f"{len(feeds)} feeds, {items} items")
+        print(f"full build      : {full * 1000:8.1f} ms")
+        print(f"no-op update    : {noop * 1000:8.1f} ms")
+        print(f"1 feed changed  : {one * 1000:8.1f} ms ({stats['shards']} shards, {stats['buckets']} buckets rewritten)")
+        terms_dir = os.path.join(directory, "terms")
+        docs_dir = os.path.join(directory, "docs")
+        describe("term shards", sizes(terms_dir), gzip_sizes(terms_dir))
+        describe("doc buckets", sizes(docs_dir), gzip_sizes(docs_dir))
+        for q in args.query:
+            print(f"query {q!r:<22}: {query_bytes(directory, q) / 1024:7.1f} KiB fetched")
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
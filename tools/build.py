@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""
+Build the site in one process: sites index, feeds -> feed.xml / sitemap /
+search index, publisher pages, listing pages (category, publishers, home).
+
+data/sites.json is read once and its SiteCatalog (catalog.py) is handed to
+every stage.
+Stages form a small dependency graph (STAGES) and run in topological order.
+Before a stage runs, a digest of its inputs is computed: sites.json, the
+content hashes of upstream outputs and the source of every tools/*.py
+module, since stages import each other's helpers (and tools/templates/ for
+the page stages). If the digest matches the one stored in
+data/build-manifest.json and the stage's outputs exist, the stage is
+skipped. The feeds stage always runs; its own scheduler decides which
+publishers are due (see update_feeds.py).
+
+Wall time is printed per stage. With --memory, so is peak Python memory
+(tracemalloc, above what was already allocated when the stage started);
+tracing slows everything down, so it is off by default.
+
+Usage: python tools/build.py [STAGE ...] [--force] [--memory] [--feeds-budget SECONDS]
+Naming stages runs only those (in dependency order); upstream stages that
+are not named are not run, their outputs are read from disk.
+--feeds-budget is the feeds stage's time budget (update_feeds.py
+--time-budget), so a slow crawl leaves time for the stages after it.
+"""
+from __future__ import annotations
+
+import argparse
+import glob
+import hashlib
+import json
+import os
+import time
+import tracemalloc
+from graphlib import TopologicalSorter
+from typing import Any, Callable, Dict, List, Optional
+
+from catalog import ROOT, SITES_JSON, SiteCatalog
+from feed_writer import write_if_changed
+
+TOOLS_DIR = os.path.dirname(os.path.abspath(__file__))
+BUILD_MANIFEST = os.path.join(ROOT, "data", "build-manifest.json")
+FEEDS_MANIFEST = os.path.join(ROOT, "data", "feeds-manifest.json")
+
+class Build:
+    """State shared by the stages of one run."""
+
+    def __init__(self, sites_bytes: bytes) -> None:
+        self.sites_bytes = sites_bytes
+        self.catalog = SiteCatalog(json.loads(sites_bytes))
+        self.sites_hash = hashlib.sha256(sites_bytes).hexdigest()
+        self.feeds_budget: Optional[float] = None
+        self._sources_hash: Optional[str] = None
+
+    def sources_hash(self) -> str:
+        """Hash of every tools/*.py module, computed once per run."""
+        if self._sources_hash is None:
+            h = hashlib.sha256()
+            for path in sorted(glob.glob(os.path.join(TOOLS_DIR, "*.py"))):
+                h.update(os.path.basename(path).encode("utf-8") + b"\0")
+                with open(path, "rb") as f:
+                    h.update(f.read())
+            self._sources_hash = h.hexdigest()
+        return self._sources_hash
+
+    def feeds_hash(self) -> str:
+        """Hash of the per-slug content hashes in data/feeds-manifest.json."""
+        try:
+            with open(FEEDS_MANIFEST, "r", encoding="utf-8") as f:
+                feeds = json.load(f).get("feeds", {})
+        except (OSError, ValueError, AttributeError):
+            feeds = {}
+        hashes = {slug: entry.get("hash") for slug, entry in feeds.items()}
+        return hashlib.sha256(json.dumps(hashes, sort_keys=True).encode("utf-8")).hexdigest()
+
+class Stage:
+    """One build step: what it needs, what it writes and how to run it."""
+
+    def __init__(self, name: str, deps: List[str], outputs: List[str],
+                 inputs: Optional[Callable[[Build], List[str]]], run: Callable[[Build], Any]) -> None:
+        self.name = name
+        self.deps = deps
+        self.outputs = outputs
+        self.inputs = inputs      # None: always run
+        self.run = run
+
+    def digest(self, build: Build) -> Optional[str]:
+        if self.inputs is None:
+            return None
+        h = hashlib.sha256(build.sources_hash().encode("utf-8"))
+        for part in self.inputs(build):
+            h.update(part.encode("utf-8"))
+        return h.hexdigest()[:32]
+
+    def outputs_exist(self) -> bool:
+        return all(os.path.exists(os.path.join(ROOT, p)) for p in self.outputs)
+
+def run_index(build: Build) -> Any:
+    import catalog
+    catalog.write_sites_index(build.catalog)
+    return 0
+
+def run_feeds(build: Build) -> Any:
+    import update_feeds
+    argv = ["--time-budget", str(build.feeds_budget)] if build.feeds_budget else []
+    return update_feeds.main(argv, data=build.catalog)
+
+def run_rss(build: Build) -> Any:
+    import generate_rss_feed
+    return generate_rss_feed.generate_rss_feed(offline=True, data=build.catalog)
+
+def run_sitemap(build: Build) -> Any:
+    import generate_sitemap
+    return generate_sitemap.main(data=build.catalog)
+
+def run_search(build: Build) -> Any:
+    import search_index
+    return search_index.build()
+
+def run_pages(build: Build) -> Any:
+    import regenerate_publisher_pages
+    return regenerate_publisher_pages.main([], data=build.catalog)
+
+def run_listings(build: Build) -> Any:
+    import listing_pages
+    return listing_pages.main([], data=build.catalog)
+
+def templates_hash() -> str:
+    import page_templates
+    return page_templates.templates_hash()
+
+STAGES = [
+    Stage("index", [], ["data/sites-index.json"], lambda b: [b.sites_hash], run_index),
+    Stage("feeds", [], ["data/feeds-manifest.json", "data/latest/all.json"], None, run_feeds),
+    Stage("rss", ["feeds"], ["feed.xml"],
+          lambda b: [b.sites_hash, b.feeds_hash()], run_rss),
+    Stage("sitemap", ["feeds"], ["sitemap.xml", "robots.txt"],
+          lambda b: [b.sites_hash, b.feeds_hash()], run_sitemap),
+    Stage("search", ["feeds"], ["data/search/index.json"],
+          lambda b: [b.feeds_hash()], run_search),
+    Stage("pages", [], ["publisher"],
+          lambda b: [b.sites_hash, templates_hash()], run_pages),
+    Stage("listings", [], ["category/index.html", "publishers/index.html", "index.html"],
+          lambda b: [b.sites_hash, templates_hash()], run_listings),
+]
+
+def load_manifest() -> Dict[str, str]:
+    try:
+        with open(BUILD_MANIFEST, "r", encoding="utf-8") as f:
+            return json.load(f).get("stages", {})
+    except (OSError, ValueError, AttributeError):
+        return {}
+
+def save_manifest(stages: Dict[str, str]) -> None:
+    write_if_changed(BUILD_MANIFEST, (json.dumps({"stages": stages}, indent=1, sort_keys=True) + "\n").encode("utf-8"))
+
+def stage_order(names: List[str]) -> List[Stage]:
+    by_name = {s.name: s for s in STAGES}
+    graph = TopologicalSorter({s.name: s.deps for s in STAGES})
+    return [by_name[n] for n in graph.static_order() if n in names]
+
+def main(argv: Optional[List[str]] = None) -> int:
+    names = [s.name for s in STAGES]
+    ap = argparse.ArgumentParser(description="Build feeds, feed.xml, sitemap and the HTML pages in one process.")
+    ap.add_argument("stages", nargs="*", metavar="STAGE", help=f"stages to run ({', '.join(names)}; default: all)")
+    ap.add_argument("--force", action="store_true", help="run stages even if their inputs are unchanged")
+    ap.add_argument("--memory", action="store_true", help="trace peak Python memory per stage (slower)")
+    ap.add_argument("--feeds-budget", type=float, metavar="SECONDS", help="time budget of the feeds stage")
+    args = ap.parse_args(argv)
+    unknown = set(args.stages) - set(names)
+    if unknown:
+        ap.error(f"unknown stage(s): {', '.join(sorted(unknown))}")
+
+    with open(SITES_JSON, "rb") as f:
+        build = Build(f.read())
+    build.feeds_budget = args.feeds_budget
+    manifest = load_manifest()
+    timings = []
+    if args.memory:
+        tracemalloc.start()
+    try:
+        for stage in stage_order(args.stages or names):
+            digest = stage.digest(build)
+            if not args.force and digest and manifest.get(stage.name) == digest and stage.outputs_exist():
+                print(f"== {stage.name}: inputs unchanged, skipped")
+                timings.append((stage.name, "skipped", 0.0, 0))
+                continue
+            print(f"== {stage.name}")
+            if args.memory:
+                tracemalloc.reset_peak()
+                base = tracemalloc.get_traced_memory()[0]
+            t = time.perf_counter()
+            result = stage.run(build)
+            elapsed = time.perf_counter() - t
+            peak = tracemalloc.get_traced_memory()[1] - base if args.memory else 0
+            if isinstance(result, int) and not isinstance(result, bool) and result != 0:
+                print(f"!! {stage.name} failed with status {result}")
+                return result
+            timings.append((stage.name, "ran", elapsed, peak))
+            if digest:
+                manifest[stage.name] = digest
+                save_manifest(manifest)
+        # Written even when every stage was skipped, so the workflows can always stage it
+        save_manifest(manifest)
+    finally:
+        tracemalloc.stop()
+        print("\nstage      status    wall" + ("      peak mem" if args.memory else ""))
+        for name, status, elapsed, peak in timings:
+            mem = f" {peak / 1048576:8.1f} MiB" if args.memory else ""
+            print(f"{name:<10} {status:<8} {elapsed:7.2f} s{mem}")
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+data/sites.json and the category slugs, shared by the generators.
+
+CATEGORY_SLUGS maps each category to its /category/<slug>/ URL slug;
+category_slug() derives one for any other category.
+
+SiteCatalog is sites.json validated once (every site needs a unique slug, a
+name and a URL) and indexed: by_slug, by_category, by_host and
+with_mastodon / with_rss, so tools look sites up instead of scanning the
+list. by_host groups the sites by every host they are fetched from (site,
+RSS and Mastodon RSS URL), e.g. the publishers sharing social.5th.ro.
+load_catalog() memoizes it per process and per field subset; tools that
+don't render the descriptions load LIGHT_FIELDS and skip them. The tools'
+`data` argument takes a catalog or a parsed sites.json (as_catalog).
+
+write_sites_index() derives data/sites-index.json, a slim copy of
+sites.json published for client-side consumers: only the fields a listing
+renders, with the English descriptions already falling back to the
+Romanian ones, at half the size of sites.json.
+"""
+from __future__ import annotations
+
+import functools
+import hashlib
+import json
+import os
+import re
+import threading
+from typing import Any, Dict, FrozenSet, Iterable, Iterator, List, Optional, Tuple, Union
+from urllib.parse import urlparse
+
+from feed_writer import write_json
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+SITES_JSON = os.path.join(ROOT, "data", "sites.json")
+SITES_INDEX_JSON = os.path.join(ROOT, "data", "sites-index.json")
+SITES_INDEX_VERSION = 1
+
+INDEX_FIELDS = ("slug", "name", "url", "rss", "category", "mastodon")
+INDEX_DESCRIPTIONS = ("description_small", "description_short", "description_long")
+
+REQUIRED_FIELDS = ("slug", "name", "url")
+# Everything but the descriptions and keywords, for tools that don't render them
+LIGHT_FIELDS = REQUIRED_FIELDS + ("rss", "category", "mastodon", "mastodon_rss")
+DEFAULT_CATEGORY = "Miscellaneous"
+
+CATEGORY_SLUGS = {
+    "PR & Marketing": "pr-marketing",
+    "Health": "health",
+    "News & Society": "news-society",
+    "Technology & Energy": "technology-energy",
+    "Business": "business",
+    "Tourism & Delta": "tourism-delta",
+    "Construction & Home": "construction-home",
+    "Miscellaneous": "miscellaneous",
+}
+
+def category_slug(category: str) -> str:
+    """URL slug of a category (/category/<slug>/)."""
+    return CATEGORY_SLUGS.get(category) or re.sub(r"[^a-z0-9]+", "-", category.lower()).strip("-")
+
+def site_seed(slug: str) -> int:
+    """Stable per-site random seed for the page generators (hash() is salted per process)."""
+    return int.from_bytes(hashlib.sha256(slug.encode("utf-8")).digest()[:8], "big")
+
+def load_sites(path: Optional[str] = None) -> Dict[str, Any]:
+    """Parsed sites.json: {"base_url", "generated_at", "sites": [...]}."""
+    with open(str(path or SITES_JSON), "r", encoding="utf-8") as f:
+        return json.load(f)
+
+@functools.lru_cache(maxsize=None)
+def site_host(url: str) -> str:
+    """Host of a site or feed URL, lowercased and without "www."."""
+    host = (urlparse(url or "").hostname or "").lower()
+    return host[4:] if host.startswith("www.") else host
+
+class CatalogError(ValueError):
+    """sites.json is malformed."""
+
+class SiteCatalog:
+    """The sites of a parsed sites.json, validated and indexed.
+
+    Sites keep sites.json order everywhere. With `fields`, each site only
+    keeps those keys (REQUIRED_FIELDS always); the data isn't modified.
+    """
+
+    def __init__(self, data: Dict[str, Any], fields: Optional[Iterable[str]] = None) -> None:
+        if not isinstance(data, dict) or not isinstance(data.get("sites"), list):
+            raise CatalogError('expected an object with a "sites" list')
+        self.fields: Optional[FrozenSet[str]] = frozenset(fields).union(REQUIRED_FIELDS) if fields else None
+        self.base_url: Optional[str] = data.get("base_url")
+        self.generated_at: Optional[str] = data.get("generated_at")
+        self.sites: List[Dict[str, Any]] = []
+        self.by_slug: Dict[str, Dict[str, Any]] = {}
+        self.by_category: Dict[str, List[Dict[str, Any]]] = {}
+        self.by_host: Dict[str, List[Dict[str, Any]]] = {}
+        self.with_mastodon: List[Dict[str, Any]] = []
+        self.with_rss: List[Dict[str, Any]] = []
+        problems = []
+        for n, site in enumerate(data["sites"]):
+            if not isinstance(site, dict):
+                problems.append(f"site #{n} is not an object")
+                continue
+            missing = [k for k in REQUIRED_FIELDS if not site.get(k)]
+            if missing:
+                problems.append(f"site #{n} ({site.get('slug') or site.get('name') or '?'}) lacks {', '.join(missing)}")
+                continue
+            if site["slug"] in self.by_slug:
+                problems.append(f"duplicate slug {site['slug']!r}")
+                continue
+            if self.fields is not None:
+                site = {k: v for k, v in site.items() if k in self.fields}
+            self.sites.append(site)
+            self.by_slug[site["slug"]] = site
+            self.by_category.setdefault(site.get("category") or DEFAULT_CATEGORY, []).append(site)
+            for host in {site_host(site.get(k)) for k in ("url", "rss", "mastodon_rss") if site.get(k)}:
+                self.by_host.setdefault(host, []).append(site)
+            if site.get("mastodon"):
+                self.with_mastodon.append(site)
+            if site.get("rss"):
+                self.with_rss.append(site)
+        if problems:
+            raise CatalogError("; ".join(problems))
+
+    def __len__(self) -> int:
+        return len(self.sites)
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        return iter(self.sites)
+
+    def __contains__(self, slug: object) -> bool:
+        return slug in self.by_slug
+
+    def get(self, slug: str) -> Optional[Dict[str, Any]]:
+        return self.by_slug.get(slug)
+
+    def data(self) -> Dict[str, Any]:
+        """A sites.json-shaped dict of the (possibly trimmed) sites."""
+        return {"base_url": self.base_url, "generated_at": self.generated_at, "sites": self.sites}
+
+_catalogs: Dict[Tuple[str, Optional[FrozenSet[str]]], SiteCatalog] = {}
+_catalogs_lock = threading.Lock()
+
+def load_catalog(path: Optional[str] = None, fields: Optional[Iterable[str]] = None) -> SiteCatalog:
+    """The catalog of `path` (default SITES_JSON), read once per process and field subset."""
+    path = os.path.abspath(str(path or SITES_JSON))
+    key = (path, frozenset(fields) if fields else None)
+    with _catalogs_lock:
+        if key not in _catalogs:
+            full = _catalogs.get((path, None))
+            _catalogs[key] = SiteCatalog(full.data() if full else load_sites(path), fields)
+        return _catalogs[key]
+
+def as_catalog(data: Union[SiteCatalog, Dict[str, Any], None] = None, path: Optional[str] = None,
+               fields: Optional[Iterable[str]] = None) -> SiteCatalog:
+    """`data` as a catalog: a SiteCatalog as is, a parsed sites.json indexed, None loaded from `path`."""
+    if isinstance(data, SiteCatalog):
+        return data
+    if data is None:
+        return load_catalog(path, fields)
+    return SiteCatalog(data, fields)
+
+def sites_index(data: Union[SiteCatalog, Dict[str, Any]]) -> Dict[str, Any]:
+    """The listing-page subset of a loaded sites.json."""
+    sites: List[Dict[str, Any]] = []
+    for s in as_catalog(data):
+        entry = {k: s[k] for k in INDEX_FIELDS if s.get(k)}
+        for field in INDEX_DESCRIPTIONS:
+            text = s.get(field + "_en") or s.get(field)
+            if text:
+                entry[field + "_en"] = text
+        sites.append(entry)
+    return {"version": SITES_INDEX_VERSION, "sites": sites}
+
+def write_sites_index(data: Union[SiteCatalog, Dict[str, Any], None] = None, path: Optional[str] = None) -> bool:
+    """Write data/sites-index.json; True if it changed."""
+    return write_json(path or SITES_INDEX_JSON, sites_index(as_catalog(data)))
+
+if __name__ == "__main__":
+    changed = write_sites_index()
+    print(f"{'Wrote' if changed else 'Unchanged'}: {SITES_INDEX_JSON}")
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Near-duplicate detection for syndicated press releases (MinHash + LSH).
+
+The same release is often published by several sister sites (pr360,
+comunicatimm, icomunicat, topcomunicate, ...) with small differences: a
+trimmed summary, another excerpt length, with or without diacritics. Exact
+link or title matching misses those, and comparing every pair of items is
+quadratic.
+
+Title and summary are entity-decoded, folded (normalize.fold) and cut to
+their first MAX_WORDS words, since sister sites cut excerpts at different
+lengths; those words form overlapping SHINGLE-word shingles. A MinHash signature of NUM_HASHES values estimates
+the Jaccard similarity of two items' shingle sets. The signature is split
+into BANDS bands of ROWS values, and items sharing a band land in the same
+LSH bucket. Each item is compared with the members of its buckets that
+belong to other publishers and are not already in its cluster; buckets
+stay small unless many items are alike, so the work is close to linear in
+the number of items. Candidates are
+joined when the exact Jaccard similarity of their shingle sets (at most
+MAX_WORDS values each, so cheap) is at least THRESHOLD; the MinHash
+estimate alone is too noisy near the threshold. With 20 bands of 3
+rows, a pair at similarity 0.5 becomes a candidate with probability ~0.93,
+a pair at 0.2 with ~0.15.
+
+A cluster holds at most one item per publisher, neither directly nor
+through a third item: sites post series whose excerpts share a template
+("Ședința de guvern din data ..."), while syndication is one release copied
+to other sites. Two clusters that have a publisher in common stay apart.
+
+dedupe() keeps one canonical item per cluster: the earliest dated copy (the
+original release), then input order. The other copies are its alternates.
+
+Usage: python tools/dedup.py   (prints the clusters found in data/feeds)
+"""
+from __future__ import annotations
+
+import hashlib
+import random
+import re
+from html import unescape
+from datetime import datetime, timezone
+from typing import Callable, Dict, FrozenSet, List, Optional, Sequence, Tuple, TypeVar
+
+from normalize import fold
+
+SHINGLE = 3
+MAX_WORDS = 32
+BANDS = 20
+ROWS = 3
+NUM_HASHES = BANDS * ROWS
+THRESHOLD = 0.5
+
+_MASK = (1 << 64) - 1
+_rng = random.Random(0x5EED)   # fixed, so signatures are stable across runs
+_PERMS = [(_rng.getrandbits(64) | 1, _rng.getrandbits(64)) for _ in range(NUM_HASHES)]
+_WORD = re.compile(r"[a-z0-9]+")
+# WordPress appends "The post <title> appeared first on <site>." (Romanian:
+# "Articolul <title> apare prima dată în <site>.") to excerpts, sometimes
+# before them too. It differs between sister sites and repeats the title, so
+# it is cut before shingling.
+_FOOTER = re.compile(r"\b(?:the post|articolul)\b.{0,300}?\b(?:appeared first on|apare prima data (?:in|pe))\b"
+                     r".{0,80}?(?:\s\.|$)", re.S)
+_LATEST = datetime.max.replace(tzinfo=timezone.utc)
+
+T = TypeVar("T")
+
+def shingles(text: str) -> List[int]:
+    """64-bit hashes of the word SHINGLE-grams of `text` (one shingle if shorter)."""
+    words = _WORD.findall(_FOOTER.sub(" ", fold(unescape(text or ""))))[:MAX_WORDS]
+    if not words:
+        return []
+    grams = {" ".join(words[i:i + SHINGLE]) for i in range(max(1, len(words) - SHINGLE + 1))}
+    return [int.from_bytes(hashlib.blake2b(g.encode(), digest_size=8).digest(), "little") for g in grams]
+
+def signature(hashes: Sequence[int]) -> Tuple[int, ...]:
+    """MinHash signature of a non-empty shingle set."""
+    return tuple(min((a * h + b) & _MASK for h in hashes) for a, b in _PERMS)
+
+def jaccard(a: FrozenSet[int], b: FrozenSet[int]) -> float:
+    return len(a & b) / len(a | b)
+
+def clusters(texts: Sequence[str], owners: Optional[Sequence[str]] = None) -> List[List[int]]:
+    """Indexes of `texts` grouped into near-duplicate clusters, in input order.
+
+    A cluster holds at most one text per entry in `owners` (the publisher).
+    """
+    sets = [frozenset(shingles(t)) for t in texts]
+    parent = list(range(len(texts)))
+    # Publishers in each cluster, kept on its root
+    members: List[FrozenSet[str]] = [frozenset([o]) for o in owners] if owners is not None else []
+
+    def find(i: int) -> int:
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    buckets: Dict[Tuple[int, Tuple[int, ...]], List[int]] = {}
+    for i, grams in enumerate(sets):
+        if not grams:
+            continue
+        sig = signature(list(grams))
+        for band in range(BANDS):
+            bucket = buckets.setdefault((band, sig[band * ROWS:(band + 1) * ROWS]), [])
+            for j in bucket:
+                a, b = find(i), find(j)
+                if a == b or (owners is not None and members[a] & members[b]):
+                    continue
+                if jaccard(sets[j], grams) >= THRESHOLD:
+                    parent[a] = b
+                    if owners is not None:
+                        members[b] |= members[a]
+            bucket.append(i)
+
+    groups: Dict[int, List[int]] = {}
+    for i in range(len(texts)):
+        groups.setdefault(find(i), []).append(i)
+    return list(groups.values())
+
+def dedupe(records: Sequence[T], text: Callable[[T], str], published: Callable[[T], Optional[datetime]],
+           owner: Optional[Callable[[T], str]] = None) -> List[Tuple[T, List[T]]]:
+    """(canonical, alternates) for every cluster of `records`."""
+    owners = [owner(r) for r in records] if owner else None
+    out = []
+    for group in clusters([text(r) for r in records], owners):
+        group.sort(key=lambda i: (published(records[i]) or _LATEST, i))
+        out.append((records[group[0]], [records[i] for i in group[1:]]))
+    return out
+
+if __name__ == "__main__":
+    import time
+    from normalize import parse_date
+    from search_index import load_feeds
+
+    entries = [dict(i, slug=slug) for slug, items in sorted(load_feeds().items()) for i in items]
+    start = time.perf_counter()
+    found = dedupe(entries, lambda e: f"{e.get('title')} {e.get('summary')}",
+                   lambda e: parse_date(e.get("published")), lambda e: e["slug"])
+    elapsed = time.perf_counter() - start
+    for canonical, alternates in found:
+        if alternates:
+            print(f"{canonical['slug']}: {canonical.get('title', '')[:70]}")
+            for alt in alternates:
+                print(f"    = {alt['slug']}: {alt.get('title', '')[:66]}")
+    dupes = sum(len(a) for _, a in found)
+    print(f"{len(entries)} items, {len(found)} clusters, {dupes} duplicates, {elapsed * 1000:.0f} ms")
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Conditional-GET state shared by the feed fetchers.
+
+For every feed URL we remember the ETag / Last-Modified validators and a
+hash of the last body we actually processed. Fetchers send the validators
+back as If-None-Match / If-Modified-Since and, on a 304 or an identical body,
+skip parsing and rewriting altogether.
+
+Per site slug it also remembers which feed URL candidate worked last, and
+keeps failing candidates on an exponential backoff so dead URLs aren't
+retried every run, plus the polling schedule (last check, next due time and
+the streak of unchanged polls) used by update_feeds.py. priority() turns
+those into a crawl order for runs with a time budget.
+
+The state lives in a small JSON file next to data/feeds/. It changes on
+every run, so it isn't committed: the feeds workflow keeps it in the
+Actions cache between runs. Without it every site is simply due.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import math
+import os
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+from feed_writer import write_if_changed
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+STATE_VERSION = 1
+BACKOFF_BASE = timedelta(hours=1)   # first retry delay after a failure
+BACKOFF_MAX = timedelta(days=7)
+
+def body_hash(content: bytes) -> str:
+    return hashlib.sha256(content or b"").hexdigest()[:32]
+
+class FeedState:
+    """Thread-safe per-URL validator and per-site candidate store backed by a JSON file."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        data = self._load()
+        self.urls: Dict[str, Dict[str, Any]] = data.get("urls", {})
+        self.sites: Dict[str, Dict[str, Any]] = data.get("sites", {})
+
+    def _load(self) -> Dict[str, Any]:
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if not isinstance(data, dict) or data.get("version") != STATE_VERSION:
+            return {}
+        return data
+
+    def get(self, url: str) -> Dict[str, Any]:
+        with self._lock:
+            return dict(self.urls.get(url) or {})
+
+    def request_headers(self, url: str) -> Dict[str, str]:
+        """Conditional request headers for `url`, empty if we never saw it."""
+        entry = self.get(url)
+        headers = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def is_unchanged(self, url: str, content: bytes) -> bool:
+        """True if `content` hashes the same as the last processed body."""
+        return self.get(url).get("hash") == body_hash(content)
+
+    def remember(self, url: str, response: Any, content: Optional[bytes] = None, **extra: Any) -> None:
+        """Store validators and body hash of a response we just processed.
+
+        Pass `content` when only part of a streamed body was read.
+        """
+        entry = {
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+            "hash": body_hash(response.content if content is None else content),
+        }
+        entry.update(extra)
+        with self._lock:
+            self.urls[url] = {k: v for k, v in entry.items() if v is not None}
+
+    def order_candidates(self, slug: str, candidates: List[str], now: Optional[datetime] = None) -> List[str]:
+        """Candidates to try for `slug`: last working one first, backed-off ones dropped."""
+        now = now or datetime.now(timezone.utc)
+        with self._lock:
+            site = self.sites.get(slug) or {}
+        failures = site.get("failures") or {}
+        good = site.get("candidate")
+        ordered = [good] if good in candidates else []
+        ordered += [c for c in candidates if c != good]
+        return [c for c in ordered
+                if c not in failures or datetime.fromisoformat(failures[c]["retry_at"]) <= now]
+
+    def record_success(self, slug: str, url: str) -> None:
+        with self._lock:
+            site = self.sites.setdefault(slug, {})
+            site["candidate"] = url
+            site.get("failures", {}).pop(url, None)
+            if not site.get("failures"):
+                site.pop("failures", None)
+
+    def record_failure(self, slug: str, url: str, now: Optional[datetime] = None) -> None:
+        """Back `url` off for BACKOFF_BASE * 2**(n-1) after its n-th consecutive failure."""
+        now = now or datetime.now(timezone.utc)
+        with self._lock:
+            site = self.sites.setdefault(slug, {})
+            failures = site.setdefault("failures", {})
+            count = failures.get(url, {}).get("count", 0) + 1
+            delay = min(BACKOFF_BASE * 2 ** min(count - 1, 16), BACKOFF_MAX)
+            failures[url] = {"count": count, "retry_at": (now + delay).isoformat()}
+            if site.get("candidate") == url:
+                site.pop("candidate")
+
+    def is_due(self, slug: str, now: Optional[datetime] = None, slack: timedelta = timedelta(0)) -> bool:
+        """True if `slug` has never been scheduled or its next poll is due by now + slack."""
+        now = now or datetime.now(timezone.utc)
+        with self._lock:
+            next_due = (self.sites.get(slug) or {}).get("next_due")
+        return not next_due or datetime.fromisoformat(next_due) <= now + slack
+
+    def unchanged_streak(self, slug: str) -> int:
+        with self._lock:
+            return (self.sites.get(slug) or {}).get("unchanged", 0)
+
+    def schedule(self, slug: str, interval: timedelta, unchanged: int, now: Optional[datetime] = None) -> None:
+        now = now or datetime.now(timezone.utc)
+        with self._lock:
+            site = self.sites.setdefault(slug, {})
+            site["checked_at"] = now.isoformat()
+            site["next_due"] = (now + interval).isoformat()
+            site["unchanged"] = unchanged
+
+    def record_check(self, slug: str, changed: bool, now: Optional[datetime] = None) -> None:
+        """Note a poll of `slug` that isn't scheduled (see schedule())."""
+        now = now or datetime.now(timezone.utc)
+        with self._lock:
+            site = self.sites.setdefault(slug, {})
+            site["checked_at"] = now.isoformat()
+            site["unchanged"] = 0 if changed else site.get("unchanged", 0) + 1
+
+    def priority(self, slug: str, now: Optional[datetime] = None) -> float:
+        """How urgently `slug` should be fetched when time is short; higher first.
+
+        Hours since the last check (staleness), divided by 1 + the streak of
+        unchanged polls (active sites first) and, when no candidate worked
+        last time, by 1 + its consecutive failures (unreliable sites last).
+        Sites never checked come first.
+        """
+        now = now or datetime.now(timezone.utc)
+        with self._lock:
+            site = dict(self.sites.get(slug) or {})
+        if not site.get("checked_at"):
+            return math.inf
+        hours = max(0.0, (now - datetime.fromisoformat(site["checked_at"])).total_seconds() / 3600)
+        failures = 0 if site.get("candidate") else min(
+            (f.get("count", 0) for f in (site.get("failures") or {}).values()), default=0)
+        return hours / (1 + site.get("unchanged", 0)) / (1 + failures)
+
+    def save(self) -> None:
+        """Write the state atomically (feed_writer.write_if_changed)."""
+        with self._lock:
+            data = {"version": STATE_VERSION, "urls": self.urls, "sites": self.sites}
+            text = json.dumps(data, ensure_ascii=False, indent=1, sort_keys=True) + "\n"
+            write_if_changed(self.path, text.encode("utf-8"))
+
+def load_state(path: Optional[str] = None) -> FeedState:
+    return FeedState(path or os.path.join(ROOT, "data", "feed_state.json"))
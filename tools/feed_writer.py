@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Streaming XML writer for the generated RSS/Atom feeds, and the JSON writer
+for the data/ files the front-end loads.
+
+Elements are written straight to a file handle as they are produced, so
+output time is linear in the number of items and memory stays bounded.
+Text and attribute values are escaped here (characters XML 1.0 does not
+allow are dropped), so callers pass plain strings.
+
+write_if_changed() is how every generator writes its output files: the file
+is replaced atomically, and left alone when its bytes would not change.
+write_json() writes minified JSON with it (pretty=True for debugging).
+remove_stale_pages() deletes the generated page directories of slugs that
+are gone.
+"""
+
+import json
+import os
+import re
+import shutil
+import tempfile
+from contextlib import contextmanager
+from xml.sax.saxutils import escape, quoteattr
+
+# Control characters are not allowed anywhere in an XML 1.0 document
+INVALID_XML_CHARS = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f\ufffe\uffff]')
+
+def xml_text(value):
+    """Escape a value for use as XML character data."""
+    return escape(INVALID_XML_CHARS.sub('', str(value)))
+
+def xml_attr(value):
+    """Quote and escape a value for use as an XML attribute."""
+    return quoteattr(INVALID_XML_CHARS.sub('', str(value)))
+
+@contextmanager
+def atomic_output(path, binary=False):
+    """Open a temp file next to `path` for writing and rename it into place on success."""
+    path = str(path)
+    directory = os.path.dirname(path) or '.'
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(prefix=f'.{os.path.basename(path)}.', suffix='.tmp', dir=directory)
+    try:
+        with (os.fdopen(fd, 'wb') if binary else os.fdopen(fd, 'w', encoding='utf-8', newline='\n')) as f:
+            yield f
+        os.chmod(tmp, 0o644)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+        raise
+
+def write_if_changed(path, content):
+    """Write `content` (bytes) to `path` unless it already holds exactly that; True if written."""
+    try:
+        with open(path, 'rb') as f:
+            if f.read() == content:
+                return False
+    except OSError:
+        pass
+    with atomic_output(path, binary=True) as f:
+        f.write(content)
+    return True
+
+def write_json(path, obj, pretty=False):
+    """Write `obj` as JSON to `path` unless it already holds exactly that; True if written."""
+    if pretty:
+        text = json.dumps(obj, ensure_ascii=False, indent=2) + '\n'
+    else:
+        text = json.dumps(obj, ensure_ascii=False, separators=(',', ':'))
+    return write_if_changed(path, text.encode('utf-8'))
+
+def remove_stale_pages(parent, keep):
+    """Delete the <parent>/<name>/ page directories whose name is not in `keep`; returns the removed names."""
+    removed = []
+    parent = str(parent)
+    if not os.path.isdir(parent):
+        return removed
+    for name in sorted(os.listdir(parent)):
+        path = os.path.join(parent, name)
+        # Only directories we generated (nothing but index.html) are removed
+        if os.path.isdir(path) and name not in keep and os.listdir(path) == ['index.html']:
+            shutil.rmtree(path)
+            removed.append(name)
+    return removed
+
+class XmlWriter:
+    """Minimal indenting XML writer on top of a text file handle."""
+
+    def __init__(self, out, indent='  '):
+        self.out = out
+        self.indent = indent
+        self._open = []
+        out.write('<?xml version="1.0" encoding="UTF-8"?>\n')
+
+    def _attrs(self, attrs):
+        if not attrs:
+            return ''
+        return ''.join(f' {name}={xml_attr(value)}' for name, value in attrs.items() if value is not None)
+
+    def start(self, tag, attrs=None):
+        self.out.write(f'{self.indent * len(self._open)}<{tag}{self._attrs(attrs)}>\n')
+        self._open.append(tag)
+
+    def end(self):
+        tag = self._open.pop()
+        self.out.write(f'{self.indent * len(self._open)}</{tag}>\n')
+
+    def element(self, tag, text=None, attrs=None):
+        pad = self.indent * len(self._open)
+        if text is None or text == '':
+            self.out.write(f'{pad}<{tag}{self._attrs(attrs)}/>\n')
+        else:
+            self.out.write(f'{pad}<{tag}{self._attrs(attrs)}>{xml_text(text)}</{tag}>\n')
+
+    def close(self):
+        while self._open:
+            self.end()
@@ -0,0 +1,352 @@
+#!/usr/bin/env python3
+"""
+Per-request fetch metrics for the feed fetchers, and the feed-health report.
+
+Every HTTP request a fetcher makes becomes a FetchRecord: publisher slug,
+kind (the site feed or its Mastodon feed), candidate URL (and where it redirected to), status code, bytes read,
+outcome, failure reason and timings:
+
+    queue     waiting for a per-host request slot (update_feeds.py); not
+              part of the request's total
+    connect   DNS lookup + TCP/TLS connect; 0 when a pooled connection was reused
+    ttfb      request start to response headers (includes connect)
+    transfer  reading the (capped) body
+    parse     building items from it
+
+Connect times come from TimedAdapter, a requests HTTPAdapter whose urllib3
+connections note how long connect() took in a thread-local, so sessions
+only need to mount it.
+
+FetchMetrics collects one run's records. write() stores the run in
+data/metrics.json under the tool's name (each tool keeps its own section),
+exports every section to data/metrics.prom in the Prometheus textfile
+format, and renders health/index.html, which ranks publishers by the fetch
+time they cost and lists the failing ones (no site-feed request succeeded).
+
+Usage: python tools/fetch_metrics.py   (re-render the report from data/metrics.json)
+"""
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from html import escape
+from typing import Any, Dict, List, Optional
+
+from requests.adapters import HTTPAdapter
+from urllib3 import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.connection import HTTPConnection, HTTPSConnection
+
+from feed_writer import atomic_output, write_json
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+METRICS_JSON = os.path.join(ROOT, "data", "metrics.json")
+METRICS_PROM = os.path.join(ROOT, "data", "metrics.prom")
+HEALTH_HTML = os.path.join(ROOT, "health", "index.html")
+
+METRICS_VERSION = 1
+PHASES = ("connect", "ttfb", "transfer", "parse")
+OK_OUTCOMES = ("ok", "not_modified", "unchanged")
+HEALTH_TOP = 25   # publishers in the "slowest" table
+
+_local = threading.local()
+
+def take_connect_time() -> float:
+    """Connect time accumulated by this thread since the last call."""
+    value = getattr(_local, "connect", 0.0)
+    _local.connect = 0.0
+    return value
+
+class _ConnectTimer:
+    def connect(self) -> None:
+        start = time.perf_counter()
+        try:
+            super().connect()   # type: ignore[misc]
+        finally:
+            _local.connect = getattr(_local, "connect", 0.0) + time.perf_counter() - start
+
+class _TimedHTTPConnection(_ConnectTimer, HTTPConnection):
+    pass
+
+class _TimedHTTPSConnection(_ConnectTimer, HTTPSConnection):
+    pass
+
+class _TimedHTTPPool(HTTPConnectionPool):
+    ConnectionCls = _TimedHTTPConnection
+
+class _TimedHTTPSPool(HTTPSConnectionPool):
+    ConnectionCls = _TimedHTTPSConnection
+
+class TimedAdapter(HTTPAdapter):
+    """HTTPAdapter whose connections report their connect time (see take_connect_time)."""
+
+    def init_poolmanager(self, *args: Any, **kwargs: Any) -> None:
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {"http": _TimedHTTPPool, "https": _TimedHTTPSPool}
+
+class FetchRecord:
+    """One request. Call response(), body() and done() as the fetch progresses."""
+
+    __slots__ = ("slug", "kind", "url", "final_url", "status", "bytes", "items", "outcome", "reason",
+                 "queue", "connect", "ttfb", "transfer", "parse", "total", "_start", "_mark")
+
+    def __init__(self, slug: str, url: str, kind: str = "site") -> None:
+        self.slug = slug
+        self.kind = kind
+        self.url = url
+        self.final_url: Optional[str] = None
+        self.status: Optional[int] = None
+        self.bytes = 0
+        self.items = 0
+        self.outcome = "error"
+        self.reason = ""
+        self.queue = self.connect = self.ttfb = self.transfer = self.parse = self.total = 0.0
+        take_connect_time()   # drop leftovers of an unrecorded request
+        self._start = self._mark = time.perf_counter()
+
+    def _lap(self) -> float:
+        now = time.perf_counter()
+        elapsed, self._mark = now - self._mark, now
+        return elapsed
+
+    def acquired(self) -> None:
+        """The request got its host slot: the wait so far is queue time, the request starts now."""
+        self.queue = self._lap()
+        self._start = self._mark
+        take_connect_time()
+
+    def response(self, status: int, final_url: Optional[str] = None) -> None:
+        self.ttfb = self._lap()
+        self.connect = take_connect_time()
+        self.status = status
+        if final_url and final_url != self.url:
+            self.final_url = final_url
+
+    def body(self, size: int) -> None:
+        self.transfer = self._lap()
+        self.bytes = size
+
+    def done(self, outcome: str, reason: str = "", items: int = 0) -> None:
+        if self.bytes and outcome in ("ok", "empty"):
+            self.parse = self._lap()
+        self.outcome = outcome
+        self.reason = reason[:200]
+        self.items = items
+        self.total = time.perf_counter() - self._start
+
+    def fail(self, exc: BaseException) -> None:
+        """done() for a request that raised `exc`."""
+        name = type(exc).__name__
+        outcome = "timeout" if "Timeout" in name else "error"
+        self.done(outcome, f"{name}: {exc}")
+
+    def to_dict(self) -> Dict[str, Any]:
+        d: Dict[str, Any] = {"kind": self.kind, "url": self.url, "status": self.status, "outcome": self.outcome}
+        if self.final_url:
+            d["final_url"] = self.final_url
+        if self.reason:
+            d["reason"] = self.reason
+        d.update({"bytes": self.bytes, "items": self.items, "total": round(self.total, 3), "queue": round(self.queue, 3)})
+        d.update({p: round(getattr(self, p), 3) for p in PHASES})
+        return d
+
+class FetchMetrics:
+    """Thread-safe collector of one fetcher run's FetchRecords."""
+
+    def __init__(self, tool: str) -> None:
+        self.tool = tool
+        self.records: List[FetchRecord] = []
+        self.started = datetime.now(timezone.utc)
+        self._t0 = time.perf_counter()
+        self._lock = threading.Lock()
+
+    def record(self, slug: str, url: str, kind: str = "site") -> FetchRecord:
+        rec = FetchRecord(slug, url, kind)
+        with self._lock:
+            self.records.append(rec)
+        return rec
+
+    def summary(self) -> Dict[str, Any]:
+        """The run as stored in metrics.json."""
+        publishers: Dict[str, Dict[str, Any]] = {}
+        outcomes: Dict[str, int] = {}
+        phases = dict.fromkeys(PHASES, 0.0)
+        for rec in self.records:
+            outcomes[rec.outcome] = outcomes.get(rec.outcome, 0) + 1
+            for p in PHASES:
+                phases[p] += getattr(rec, p)
+            pub = publishers.setdefault(rec.slug, {"ok": False, "time": 0.0, "bytes": 0, "requests": []})
+            pub["time"] += rec.total
+            pub["bytes"] += rec.bytes
+            pub["requests"].append(rec.to_dict())
+        for pub in publishers.values():
+            pub["time"] = round(pub["time"], 3)
+            # Judged on the site feed; a Mastodon-only fetch counts on its own
+            judged = [r for r in pub["requests"] if r["kind"] == "site"] or pub["requests"]
+            pub["ok"] = any(r["outcome"] in OK_OUTCOMES for r in judged)
+            if not pub["ok"]:
+                last = judged[-1]
+                pub.update(reason=last.get("reason") or last["outcome"], status=last["status"], url=last["url"])
+        return {
+            "run_at": self.started.replace(microsecond=0).isoformat(),
+            "wall": round(time.perf_counter() - self._t0, 3),
+            "requests": len(self.records),
+            "bytes": sum(r.bytes for r in self.records),
+            "fetch_time": round(sum(r.total for r in self.records), 3),
+            "queue_time": round(sum(r.queue for r in self.records), 3),
+            "phases": {p: round(v, 3) for p, v in phases.items()},
+            "outcomes": outcomes,
+            "failing": sum(1 for p in publishers.values() if not p["ok"]),
+            "publishers": dict(sorted(publishers.items())),
+        }
+
+    def write(self, path: Optional[str] = None, prom_path: Optional[str] = None,
+              health_path: Optional[str] = None) -> None:
+        """Store this run in metrics.json, then refresh the textfile export and the report."""
+        path = path or METRICS_JSON
+        metrics = load_metrics(path)
+        metrics["tools"][self.tool] = self.summary()
+        write_json(path, metrics)
+        write_prometheus(metrics, prom_path or METRICS_PROM)
+        write_health(metrics, health_path or HEALTH_HTML)
+
+def load_metrics(path: Optional[str] = None) -> Dict[str, Any]:
+    try:
+        with open(path or METRICS_JSON, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        data = {}
+    if data.get("version") != METRICS_VERSION:
+        data = {"version": METRICS_VERSION, "tools": {}}
+    return data
+
+def _label(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def write_prometheus(metrics: Dict[str, Any], path: str) -> None:
+    """Prometheus textfile-collector export of every tool's last run."""
+    families = {
+        "feed_fetch_last_run_timestamp_seconds": ("gauge", "Start of the tool's last fetch run."),
+        "feed_fetch_run_seconds": ("gauge", "Wall time of the last fetch run."),
+        "feed_fetch_requests": ("gauge", "Requests in the last run, by outcome."),
+        "feed_fetch_phase_seconds": ("gauge", "Request time in the last run, by phase."),
+        "feed_fetch_publisher_up": ("gauge", "1 if a site-feed request for the publisher succeeded in the last run."),
+        "feed_fetch_publisher_seconds": ("gauge", "Time spent on a publisher's requests in the last run."),
+        "feed_fetch_publisher_bytes": ("gauge", "Bytes read for a publisher in the last run."),
+    }
+    samples: Dict[str, List[str]] = {name: [] for name in families}
+
+    def add(name: str, labels: Dict[str, Any], value: float) -> None:
+        inner = ",".join(f'{k}="{_label(v)}"' for k, v in labels.items())
+        samples[name].append(f"{name}{{{inner}}} {value}")
+
+    for tool, run in sorted(metrics["tools"].items()):
+        add("feed_fetch_last_run_timestamp_seconds", {"tool": tool}, datetime.fromisoformat(run["run_at"]).timestamp())
+        add("feed_fetch_run_seconds", {"tool": tool}, run["wall"])
+        for outcome, n in sorted(run["outcomes"].items()):
+            add("feed_fetch_requests", {"tool": tool, "outcome": outcome}, n)
+        for phase, seconds in run["phases"].items():
+            add("feed_fetch_phase_seconds", {"tool": tool, "phase": phase}, seconds)
+        for slug, pub in run["publishers"].items():
+            add("feed_fetch_publisher_up", {"tool": tool, "slug": slug}, int(pub["ok"]))
+            add("feed_fetch_publisher_seconds", {"tool": tool, "slug": slug}, pub["time"])
+            add("feed_fetch_publisher_bytes", {"tool": tool, "slug": slug}, pub["bytes"])
+
+    lines: List[str] = []
+    for name, (kind, help_text) in families.items():
+        lines += [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"] + samples[name]
+    with atomic_output(path) as f:
+        f.write("\n".join(lines) + "\n")
+
+HEALTH_HEAD = """<!doctype html>
+<html lang="en" dir="ltr">
+<head>
+  <link rel="icon" type="image/svg+xml" href="/favicon.svg">
+  <meta charset="utf-8">
+  <meta name="viewport" content="width=device-width, initial-scale=1">
+  <title>Feed health — Release Press Releases Romania</title>
+  <meta name="robots" content="noindex,nofollow">
+  <link rel="stylesheet" href="/assets/styles.css">
+  <style>
+    .health table { width: 100%; border-collapse: collapse; font-size: 14px; margin: 0 0 32px 0; }
+    .health th, .health td { text-align: left; padding: 6px 8px; border-bottom: 1px solid var(--border); vertical-align: top; }
+    .health td.num, .health th.num { text-align: right; font-variant-numeric: tabular-nums; }
+    .health .reason { color: var(--muted); word-break: break-word; }
+  </style>
+</head>
+<body>
+<main>
+<div class="nav">
+  <div class="nav-inner">
+    <a class="brand" href="/" aria-label="Release Press Releases in Romania homepage">
+      <img src="/assets/images/logo.svg" alt="Release Press Releases in Romania" width="36" height="36" class="brand-logo" loading="eager">
+      <span>Release Press Romania</span>
+    </a>
+    <div class="nav-links">
+      <a href="/publishers/">Publishers</a>
+      <a href="/category/">Categories</a>
+      <a href="/feed.xml">RSS Feed</a>
+    </div>
+  </div>
+</div>
+<div class="container health">
+  <div class="breadcrumb">
+    <a href="/">Home</a> › <span>Feed health</span>
+  </div>
+  <h1 class="page-title">Feed health</h1>
+"""
+
+def _publisher_link(slug: str) -> str:
+    return f'<a href="/publisher/{escape(slug)}/">{escape(slug)}</a>'
+
+def render_health(metrics: Dict[str, Any]) -> str:
+    out = [HEALTH_HEAD]
+    for tool, run in sorted(metrics["tools"].items()):
+        pubs = run["publishers"]
+        total = run["fetch_time"] or 1.0
+        out.append(f"  <h2>{escape(tool)}</h2>\n")
+        out.append(f'  <p class="page-sub">Run {escape(run["run_at"])}: {run["wall"]:.1f} s wall, '
+                   f'{run["requests"]} requests, {run["fetch_time"]:.1f} s of request time '
+                   f'(plus {run.get("queue_time", 0.0):.1f} s waiting for a host slot), '
+                   f'{run["bytes"] / 1024:.0f} KiB, {len(pubs)} publishers, {run["failing"]} failing. '
+                   + ", ".join(f"{p} {s:.1f} s" for p, s in run["phases"].items()) + ".</p>\n")
+
+        slowest = sorted(pubs.items(), key=lambda kv: kv[1]["time"], reverse=True)[:HEALTH_TOP]
+        out.append('  <h3>Where the fetch time goes</h3>\n  <table>\n    <tr><th>Publisher</th>'
+                   '<th class="num">Time s</th><th class="num">Share</th><th class="num">Requests</th>'
+                   + "".join(f'<th class="num">{p}</th>' for p in PHASES) + '<th class="num">KiB</th></tr>\n')
+        for slug, pub in slowest:
+            reqs = pub["requests"]
+            out.append(f"    <tr><td>{_publisher_link(slug)}</td><td class=\"num\">{pub['time']:.2f}</td>"
+                       f"<td class=\"num\">{pub['time'] / total:.0%}</td><td class=\"num\">{len(reqs)}</td>"
+                       + "".join(f"<td class=\"num\">{sum(r[p] for r in reqs):.2f}</td>" for p in PHASES)
+                       + f"<td class=\"num\">{pub['bytes'] / 1024:.0f}</td></tr>\n")
+        out.append("  </table>\n")
+
+        failing = sorted((kv for kv in pubs.items() if not kv[1]["ok"]), key=lambda kv: kv[1]["time"], reverse=True)
+        out.append(f"  <h3>Failing publishers ({len(failing)})</h3>\n")
+        if failing:
+            out.append('  <table>\n    <tr><th>Publisher</th><th>Status</th><th>Reason</th><th>Last URL tried</th>'
+                       '<th class="num">Time s</th></tr>\n')
+            for slug, pub in failing:
+                out.append(f"    <tr><td>{_publisher_link(slug)}</td><td>{pub['status'] or '—'}</td>"
+                           f"<td class=\"reason\">{escape(pub['reason'])}</td><td class=\"reason\">{escape(pub['url'])}</td>"
+                           f"<td class=\"num\">{pub['time']:.2f}</td></tr>\n")
+            out.append("  </table>\n")
+        else:
+            out.append("  <p>None.</p>\n")
+    out.append('  <p class="page-sub">Raw data: <a href="/data/metrics.json">metrics.json</a>, '
+               '<a href="/data/metrics.prom">metrics.prom</a>.</p>\n</div>\n</main>\n</body>\n</html>\n')
+    return "".join(out)
+
+def write_health(metrics: Dict[str, Any], path: str) -> None:
+    with atomic_output(path) as f:
+        f.write(render_health(metrics))
+
+if __name__ == "__main__":
+    data = load_metrics()
+    write_prometheus(data, METRICS_PROM)
+    write_health(data, HEALTH_HTML)
+    print(f"Rendered {HEALTH_HTML} from {len(data['tools'])} tool runs")
@@ -2,153 +2,109 @@
 """
 Generate professional RSS feed aggregating all publisher feeds.
 Optimized for SEO, fast indexing, and proper signal transmission without appearing as link-farm.
+
+Feeds are requested conditionally (see feed_state.py). Parsed items of every
+feed are kept in data/rss_feed_state.json, so a 304 or an identical body
+reuses them without parsing, and feed.xml is left alone when nothing changed.
+
+Online runs time and record every request (fetch_metrics.py) into
+data/metrics.json, data/metrics.prom and the health/ report.
+
+With --offline no network request is made at all: items are read from the
+data/feeds/<slug>.json cache that update_feeds.py refreshes hourly, and
+feed.xml is left alone when it already lists exactly those items.
+
+Within each category, publishers are fetched in priority order
+(FeedState.priority: stale, active and reliable ones first). With
+--time-budget SECONDS no request is started once the budget is spent: the
+remaining publishers are filled in from the data/feeds cache instead, so a
+slow run still writes a complete feed.xml.
+
+Online runs also record the raw responses in data/responses/ (see
+response_store.py). With --replay every feed is answered from there instead
+(the newest stored body, or the newest at or before --replay-at): no
+network, no delays, no conditional requests.
+
+A release syndicated to several publishers appears once (see dedup.py): the
+earliest copy is the <item>, the other copies are listed as
+<atom:link rel="alternate"> elements inside it.
 """
 
+import io
 import json
+import re
 import requests
 from datetime import datetime, timezone
 from pathlib import Path
 import time
-from urllib.parse import urljoin, urlparse
-import html
 import xml.etree.ElementTree as ET
-import re
+
+from catalog import LIGHT_FIELDS, as_catalog
+from dedup import dedupe
+from feed_parser import parse_items, read_feed, stream_entries
+from feed_state import FeedState
+from feed_writer import XmlWriter, atomic_output
+from fetch_metrics import FetchMetrics, FetchRecord, TimedAdapter
+from normalize import Item
+from response_store import ResponseStore
 
 # Configuration
 SITES_JSON = Path(__file__).parent.parent / "data" / "sites.json"
 OUTPUT_FILE = Path(__file__).parent.parent / "feed.xml"
+STATE_JSON = Path(__file__).parent.parent / "data" / "rss_feed_state.json"
+FEEDS_DIR = Path(__file__).parent.parent / "data" / "feeds"
 BASE_URL = "https://release-press-releases-romania.github.io"
 MAX_ITEMS_PER_FEED = 3  # Reduced to avoid link-farm appearance - quality over quantity
 MAX_TOTAL_ITEMS = 150  # Optimal for RSS feed performance and SEO
 REQUEST_TIMEOUT = 10
 REQUEST_DELAY = 0.5  # More respectful delay
 
-def clean_html(text):
-    """Remove HTML tags and clean text."""
-    if not text:
-        return ""
-    # Remove HTML tags
-    text = re.sub(r'<[^>]+>', '', text)
-    # Decode HTML entities
-    text = html.unescape(text)
-    # Clean whitespace
-    text = ' '.join(text.split())
-    return text.strip()
+def items_from_stream(stream, body, url, max_items=MAX_ITEMS_PER_FEED):
+    """Build feed.xml items with the shared fast parser (feedparser as fallback)."""
+    # Only keep items with a link (titles fall back to "Update")
+    return [item for item in parse_items(stream, body, url, max_items) if item.link]
 
 def parse_rss_feed(xml_content, url, max_items=MAX_ITEMS_PER_FEED):
     """Parse RSS/Atom feed XML with enhanced error handling."""
-    items = []
     try:
-        root = ET.fromstring(xml_content)
-        
-        # Handle RSS 2.0
-        if root.tag == 'rss':
-            channel = root.find('channel')
-            if channel is not None:
-                feed_title = channel.findtext('title', 'Unknown Feed')
-                feed_link = channel.findtext('link', url)
-                
-                for item in channel.findall('item')[:max_items]:
-                    title = clean_html(item.findtext('title', 'Untitled'))
-                    link = item.findtext('link', '').strip()
-                    description_raw = item.findtext('description', '')
-                    pub_date_str = item.findtext('pubDate', '')
-                    author = clean_html(item.findtext('author', ''))
-                    
-                    # Try to get content:encoded for better description
-                    content_elem = item.find('{http://purl.org/rss/1.0/modules/content/}encoded')
-                    if content_elem is not None and content_elem.text:
-                        description_raw = content_elem.text
-                    
-                    # Clean description
-                    description = clean_html(description_raw)
-                    if len(description) > 400:  # Optimal length for RSS
-                        description = description[:397] + "..."
-                    
-                    # Parse date
-                    pub_date = parse_rss_date(pub_date_str)
-                    
-                    # Only add if we have valid title and link
-                    if title and link:
-                        items.append({
-                            'title': title,
-                            'link': link,
-                            'description': description,
-                            'published': pub_date,
-                            'author': author,
-                            'feed_title': feed_title,
-                            'feed_link': feed_link
-                        })
-        
-        # Handle Atom
-        elif root.tag == '{http://www.w3.org/2005/Atom}feed':
-            feed_title = root.findtext('{http://www.w3.org/2005/Atom}title', 'Unknown Feed')
-            feed_link_elem = root.find('{http://www.w3.org/2005/Atom}link[@rel="alternate"]')
-            feed_link = feed_link_elem.get('href', url) if feed_link_elem is not None else url
-            
-            for entry in root.findall('{http://www.w3.org/2005/Atom}entry')[:max_items]:
-                title = clean_html(entry.findtext('{http://www.w3.org/2005/Atom}title', 'Untitled'))
-                link_elem = entry.find('{http://www.w3.org/2005/Atom}link')
-                link = link_elem.get('href', '').strip() if link_elem is not None else ''
-                summary = clean_html(entry.findtext('{http://www.w3.org/2005/Atom}summary', ''))
-                content_elem = entry.find('{http://www.w3.org/2005/Atom}content')
-                content = clean_html(content_elem.text if content_elem is not None and content_elem.text else summary)
-                updated = entry.findtext('{http://www.w3.org/2005/Atom}updated', '')
-                author_elem = entry.find('{http://www.w3.org/2005/Atom}author')
-                author = clean_html(author_elem.findtext('{http://www.w3.org/2005/Atom}name', '')) if author_elem is not None else ''
-                
-                pub_date = parse_rss_date(updated)
-                
-                description = content or summary
-                if len(description) > 400:
-                    description = description[:397] + "..."
-                
-                if title and link:
-                    items.append({
-                        'title': title,
-                        'link': link,
-                        'description': description,
-                        'published': pub_date,
-                        'author': author,
-                        'feed_title': feed_title,
-                        'feed_link': feed_link
-                    })
-    
-    except ET.ParseError as e:
-        print(f"  ⚠️  XML parsing error: {e}")
+        stream = stream_entries([xml_content], max_items)
+        return items_from_stream(stream, stream.document(), url, max_items)
+    except ET.ParseError:
+        # Malformed XML: leave it to the feedparser fallback
+        return items_from_stream(None, xml_content, url, max_items)
     except Exception as e:
         print(f"  ⚠️  Error parsing feed: {e}")
-    
-    return items
+    return []
 
-def parse_rss_date(date_str):
-    """Parse RSS date string to datetime with enhanced format support."""
-    if not date_str:
-        return datetime.now(timezone.utc)
-    
-    formats = [
-        '%a, %d %b %Y %H:%M:%S %z',
-        '%a, %d %b %Y %H:%M:%S %Z',
-        '%Y-%m-%dT%H:%M:%S%z',
-        '%Y-%m-%dT%H:%M:%SZ',
-        '%Y-%m-%dT%H:%M:%S.%f%z',
-        '%Y-%m-%d %H:%M:%S',
-        '%Y-%m-%d'
-    ]
-    
-    for fmt in formats:
-        try:
-            dt = datetime.strptime(date_str.strip(), fmt)
-            if dt.tzinfo is None:
-                dt = dt.replace(tzinfo=timezone.utc)
-            return dt
-        except ValueError:
-            continue
-    
-    return datetime.now(timezone.utc)
+def items_to_state(items):
+    """Make parsed items JSON-serializable for the state file."""
+    return [item.to_dict() for item in items]
+
+def items_from_state(items):
+    return [Item.from_dict(item) for item in items or []]
+
+_session = None
+_store = None       # ResponseStore recording responses, or answering them when replaying
+_replay = False
+_replay_at = None
+
+def get_session():
+    """Keep-alive session whose connections report their connect time."""
+    global _session
+    if _session is None:
+        _session = requests.Session()
+        _session.mount('http://', TimedAdapter())
+        _session.mount('https://', TimedAdapter())
+    return _session
 
-def fetch_feed(url, max_items=MAX_ITEMS_PER_FEED):
-    """Fetch and parse an RSS feed with proper error handling."""
+def fetch_feed(url, max_items=MAX_ITEMS_PER_FEED, state=None, metrics=None, slug=''):
+    """Fetch and parse an RSS feed with proper error handling.
+
+    Returns (items, changed). With a FeedState, unchanged feeds (304 or same
+    body hash) return the items cached from the last parse and changed=False.
+    The request is recorded in `metrics` (a FetchMetrics) when given.
+    """
+    rec = metrics.record(slug, url) if metrics else FetchRecord(slug, url)
     try:
         headers = {
             'User-Agent': 'Mozilla/5.0 (compatible; ReleasePressReleasesBot/1.0; +https://release-press-releases-romania.github.io/feed.xml)',
@@ -157,56 +113,224 @@ def fetch_feed(url, max_items=MAX_ITEMS_PER_FEED):
             'Accept-Encoding': 'gzip, deflate',
             'Connection': 'keep-alive'
         }
+        cached = state.get(url) if state else {}
+        if 'items' in cached:
+            headers.update(state.request_headers(url))
         
-        try:
-            response = requests.get(url, timeout=REQUEST_TIMEOUT, headers=headers, verify=True, allow_redirects=True)
-        except requests.exceptions.SSLError:
-            import urllib3
-            urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
-            response = requests.get(url, timeout=REQUEST_TIMEOUT, headers=headers, verify=False, allow_redirects=True)
+        if _replay:
+            response = _store.open(url, _replay_at)
+        else:
+            session = get_session()
+            try:
+                response = session.get(url, timeout=REQUEST_TIMEOUT, headers=headers, verify=True, allow_redirects=True, stream=True)
+            except requests.exceptions.SSLError:
+                import urllib3
+                urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+                response = session.get(url, timeout=REQUEST_TIMEOUT, headers=headers, verify=False, allow_redirects=True, stream=True)
+        recording = _store is not None and not _replay
         
-        response.raise_for_status()
+        # Read only as much of the body as the first max_items entries need
+        with response:
+            rec.response(response.status_code, response.url)
+            if recording and (response.status_code == 304 or response.status_code >= 400):
+                _store.put(url, response)
+            if response.status_code == 304 and 'items' in cached:
+                rec.done('not_modified')
+                return items_from_state(cached['items']), False
+            
+            response.raise_for_status()
+            raw = []
+            stream, body = read_feed(response, max_items, raw)
+            if recording:
+                _store.put(url, response, b''.join(raw))
+            rec.body(sum(len(c) for c in raw))
         
-        # Check content type
-        content_type = response.headers.get('Content-Type', '').lower()
-        if 'xml' not in content_type and 'rss' not in content_type and 'atom' not in content_type:
-            # Still try to parse - some feeds have wrong content-type
-            pass
+        # Hash the part of the feed we keep, so changes further down don't count
+        if 'items' in cached and state.is_unchanged(url, body):
+            rec.done('unchanged')
+            return items_from_state(cached['items']), False
         
-        items = parse_rss_feed(response.content, url, max_items)
-        return items
-    except requests.exceptions.Timeout:
+        items = items_from_stream(stream, body, url, max_items)
+        rec.done('ok' if items else 'empty', '' if items else 'no items parsed', len(items))
+        if state and items:
+            state.remember(url, response, content=body, items=items_to_state(items))
+        return items, True
+    except requests.exceptions.HTTPError as e:
+        rec.done('http_error', f"HTTP {e.response.status_code}")
+        print(f"  ⚠️  HTTP {e.response.status_code}")
+        return [], True
+    except requests.exceptions.Timeout as e:
+        rec.fail(e)
         print(f"  ⚠️  Timeout")
-        return []
+        return [], True
     except requests.exceptions.RequestException as e:
+        rec.fail(e)
         print(f"  ⚠️  Request error: {str(e)[:50]}")
-        return []
+        return [], True
     except Exception as e:
+        rec.fail(e)
         print(f"  ⚠️  Error: {str(e)[:50]}")
+        return [], True
+
+def load_cached_items(site, max_items=MAX_ITEMS_PER_FEED):
+    """Read items for a site from the data/feeds cache written by update_feeds.py."""
+    try:
+        with open(FEEDS_DIR / f"{site.get('slug')}.json", 'r', encoding='utf-8') as f:
+            cached = json.load(f)
+    except (OSError, ValueError):
         return []
+    
+    items = [Item.from_dict(entry) for entry in cached.get('items') or [] if entry.get('link')]
+    return items[:max_items]
+
+CHANNEL_DESCRIPTION = (
+    "Aggregated RSS feed of press releases from over 100 Romanian publishers. "
+    "Covering PR & Marketing, Health, News & Society, Technology, Business, Construction, Tourism, and more. "
+    "Curated selection of quality press releases from trusted Romanian sources."
+)
+CHANNEL_CATEGORIES = ['Press Releases', 'Romania', 'News', 'Media', 'RSS Feed']
+NAMESPACES = {
+    'version': '2.0',
+    'xmlns:content': 'http://purl.org/rss/1.0/modules/content/',
+    'xmlns:atom': 'http://www.w3.org/2005/Atom',
+    'xmlns:dc': 'http://purl.org/dc/elements/1.1/',
+    'xmlns:sy': 'http://purl.org/rss/1.0/modules/syndication/',
+}
+
+def write_rss_item(w, item):
+    """Write one <item>; values are escaped by the writer."""
+    site_name = item.site_name or 'Unknown'
+    site_slug = item.site_slug or ''
+    author = site_name
+    description = item.summary or ''
+    if len(description) > 400:  # Optimal length for RSS
+        description = description[:397] + "..."
+    link = item.link or ''
+    publisher_url = f"{BASE_URL}/publisher/{site_slug}/"
+    
+    # Enhanced description with context
+    enhanced_desc = description
+    if site_name != 'Unknown':
+        enhanced_desc = f"From {site_name}: {description}"
+    
+    w.start('item')
+    w.element('title', item.title or 'Untitled')
+    w.element('link', link)
+    w.element('description', enhanced_desc)
+    # Undated items carry no date rather than an invented "now"
+    if item.published:
+        w.element('pubDate', item.published.strftime('%a, %d %b %Y %H:%M:%S %z'))
+    w.element('author', f"{author} ({publisher_url})")
+    w.element('dc:creator', author)
+    if item.published:
+        w.element('dc:date', item.published.isoformat())
+    w.element('category', item.category or 'Miscellaneous', {'domain': f"{BASE_URL}/category/"})
+    # Use link as permalink GUID
+    w.element('guid', link or publisher_url, {'isPermaLink': 'true'})
+    w.element('source', site_name, {'url': publisher_url})
+    for alt in item.alternates:
+        w.element('atom:link', None, {'rel': 'alternate', 'href': alt.link, 'title': alt.site_name or ''})
+    
+    # Add content:encoded if we have longer description
+    if len(description) > 200:
+        w.element('content:encoded', enhanced_desc)
+    
+    # Add comments link if available
+    if link:
+        w.element('comments', f"{link}#comments")
+    w.end()
 
-def generate_rss_feed():
-    """Generate the aggregated RSS feed optimized for SEO and indexing."""
-    print("Generating optimized RSS feed...")
+RSS_DATE = '%a, %d %b %Y %H:%M:%S %z'
+
+def write_rss(path, items, title='Release Press Releases in Romania - Aggregated Feed',
+              description=CHANNEL_DESCRIPTION, self_url=f"{BASE_URL}/feed.xml"):
+    """Stream an RSS 2.0 document for `items` to `path`, replacing it atomically."""
+    with atomic_output(path) as f:
+        render_rss(f, items, datetime.now(timezone.utc), title, description, self_url)
+
+def rss_unchanged(path, items):
+    """True if `path` already is the feed of `items`, apart from its build date."""
+    try:
+        old = Path(path).read_text(encoding='utf-8')
+        built = datetime.strptime(re.search(r'<lastBuildDate>([^<]+)</lastBuildDate>', old).group(1), RSS_DATE)
+    except (OSError, AttributeError, ValueError):
+        return False
+    out = io.StringIO()
+    render_rss(out, items, built)
+    return out.getvalue() == old
+
+def render_rss(out, items, now, title='Release Press Releases in Romania - Aggregated Feed',
+               description=CHANNEL_DESCRIPTION, self_url=f"{BASE_URL}/feed.xml"):
+    """Stream an RSS 2.0 document for `items`, built at `now`, to the text file `out`."""
+    rss_date = now.strftime(RSS_DATE)
+    w = XmlWriter(out)
+    w.start('rss', NAMESPACES)
+    w.start('channel')
+    w.element('title', title)
+    w.element('link', BASE_URL)
+    w.element('description', description)
+    w.element('language', 'en')
+    w.element('lastBuildDate', rss_date)
+    w.element('pubDate', rss_date)
+    w.element('generator', 'Release Press Releases in Romania RSS Aggregator v2.0')
+    w.element('webMaster', 'noreply@release-press-releases-romania.github.io (Release Press Releases)')
+    w.element('managingEditor', 'noreply@release-press-releases-romania.github.io (Release Press Releases)')
+    w.element('atom:link', None, {'href': self_url, 'rel': 'self', 'type': 'application/rss+xml'})
+    w.start('image')
+    w.element('url', f"{BASE_URL}/assets/images/logo.svg")
+    w.element('title', 'Release Press Releases in Romania')
+    w.element('link', BASE_URL)
+    w.element('width', '144')
+    w.element('height', '144')
+    w.end()
+    for category in CHANNEL_CATEGORIES:
+        w.element('category', category)
+    w.element('ttl', '60')
+    w.element('sy:updatePeriod', 'hourly')
+    w.element('sy:updateFrequency', '1')
+    w.element('copyright', f"Copyright {now.year} Release Press Releases in Romania. Content belongs to respective publishers.")
+    w.element('docs', 'https://www.rssboard.org/rss-specification')
+    
+    for item in items:
+        write_rss_item(w, item)
+    w.close()
+
+def generate_rss_feed(offline=False, data=None, replay=False, replay_at=None, record=True, time_budget=None):
+    """Generate the aggregated RSS feed optimized for SEO and indexing.
+    
+    With offline=True items come from the data/feeds cache instead of the network,
+    with replay=True from the stored raw responses (record=False: don't store them).
+    After `time_budget` seconds the remaining feeds come from the cache too.
+    `data` is an already loaded SiteCatalog or sites.json (see build.py).
+    """
+    deadline = time.monotonic() + time_budget if time_budget else None
+    global _store, _replay, _replay_at
+    _replay, _replay_at = replay or bool(replay_at), replay_at
+    _store = ResponseStore() if not offline and (_replay or record) else None
+    source = ' from local cache' if offline else ' from stored responses' if _replay else ''
+    print(f"Generating optimized RSS feed{source}...")
     
     # Load sites data
-    with open(SITES_JSON, 'r', encoding='utf-8') as f:
-        data = json.load(f)
+    catalog = as_catalog(data, SITES_JSON, LIGHT_FIELDS)
     
     # Collect RSS feeds with diversity strategy (avoid link-farm pattern)
     all_items = []
     feeds_processed = 0
-    feeds_by_category = {}
+    feeds_changed = 0
+    feeds_cached = 0
+    online = not (offline or _replay)
+    state = FeedState(str(STATE_JSON)) if online else None
+    metrics = FetchMetrics('generate_rss_feed') if online else None
     
-    sites_with_rss = [s for s in data['sites'] if s.get('rss')]
+    sites_with_rss = catalog.with_rss
     print(f"Processing {len(sites_with_rss)} publishers with RSS feeds...")
     
-    # Group by category for balanced distribution
-    for site in sites_with_rss:
-        cat = site.get('category', 'Miscellaneous')
-        if cat not in feeds_by_category:
-            feeds_by_category[cat] = []
-        feeds_by_category[cat].append(site)
+    # Group by category for balanced distribution (copies: the loop pops them;
+    # sites without RSS are skipped there)
+    feeds_by_category = {cat: list(sites) for cat, sites in catalog.by_category.items()}
+    if state:
+        for cat_sites in feeds_by_category.values():
+            cat_sites.sort(key=lambda s: state.priority(s.get('slug', '')), reverse=True)
     
     # Process feeds with category diversity
     processed_sites = set()
@@ -236,140 +360,106 @@ def generate_rss_feed():
         site_name = site.get('name', site.get('slug', 'Unknown'))
         print(f"  [{feeds_processed + 1}/{len(sites_with_rss)}] {site_name} ({cat})...", end=' ', flush=True)
         
-        items = fetch_feed(rss_url, MAX_ITEMS_PER_FEED)
+        out_of_time = deadline is not None and time.monotonic() >= deadline
+        if offline or out_of_time:
+            # Offline, feed.xml is compared with the cached items once they are all in
+            items, changed = load_cached_items(site, MAX_ITEMS_PER_FEED), out_of_time
+            feeds_cached += out_of_time
+        else:
+            items, changed = fetch_feed(rss_url, MAX_ITEMS_PER_FEED, state, metrics, site.get('slug', ''))
+            if state:
+                state.record_check(site.get('slug', ''), changed)
+                if items:
+                    state.record_success(site.get('slug', ''), rss_url)
+                else:
+                    state.record_failure(site.get('slug', ''), rss_url)
+        feeds_changed += changed
         
         # Add site information to items
         for item in items:
-            item['site_name'] = site_name
-            item['site_slug'] = site.get('slug', '')
-            item['category'] = site.get('category', 'Miscellaneous')
-            item['site_url'] = site.get('url', '')
+            item.site_name = site_name
+            item.site_slug = site.get('slug', '')
+            item.category = site.get('category', 'Miscellaneous')
+            item.site_url = site.get('url', '')
         
         all_items.extend(items)
         feeds_processed += 1
         processed_sites.add(site.get('slug'))
         
-        if items:
+        if out_of_time:
+            print(f"⏱️  ({len(items)} cached items, out of time)")
+        elif items and not changed:
+            print(f"✓ ({len(items)} items, unchanged)")
+        elif items:
             print(f"✓ ({len(items)} items)")
         else:
             print(f"⚠️  (0 items)")
         
         # Respectful delay
-        time.sleep(REQUEST_DELAY)
+        if online and not out_of_time:
+            time.sleep(REQUEST_DELAY)
         
         # Stop if we have enough items
         if len(all_items) >= MAX_TOTAL_ITEMS:
             break
     
-    # Sort by publication date (newest first)
-    all_items.sort(key=lambda x: x['published'], reverse=True)
+    # One item per syndicated release, the other copies become alternates
+    clusters = dedupe(all_items, lambda x: f"{x.title} {x.summary}", lambda x: x.published, lambda x: x.site_slug)
+    for item, alternates in clusters:
+        item.alternates = alternates
+    if len(clusters) < len(all_items):
+        print(f"  ✓ Merged {len(all_items) - len(clusters)} syndicated copies")
+    all_items = [item for item, _ in clusters]
+    
+    # Sort by publication date (newest first, undated items last)
+    oldest = datetime.min.replace(tzinfo=timezone.utc)
+    all_items.sort(key=lambda x: (x.published is not None, x.published or oldest), reverse=True)
     
     # Limit total items
     all_items = all_items[:MAX_TOTAL_ITEMS]
     
-    print(f"  ✓ Processed {feeds_processed} feeds")
-    print(f"  ✓ Collected {len(all_items)} items from {len(set(i['site_slug'] for i in all_items))} unique publishers")
-    
-    # Generate RSS XML with enhanced metadata
-    now = datetime.now(timezone.utc)
-    rss_date = now.strftime('%a, %d %b %Y %H:%M:%S %z')
-    
-    rss_xml = f'''<?xml version="1.0" encoding="UTF-8"?>
-<rss version="2.0" xmlns:content="http://purl.org/rss/1.0/modules/content/" xmlns:atom="http://www.w3.org/2005/Atom" xmlns:dc="http://purl.org/dc/elements/1.1/" xmlns:sy="http://purl.org/rss/1.0/modules/syndication/">
-  <channel>
-    <title>Release Press Releases in Romania - Aggregated Feed</title>
-    <link>{BASE_URL}</link>
-    <description>Aggregated RSS feed of press releases from over 100 Romanian publishers. Covering PR &amp; Marketing, Health, News &amp; Society, Technology, Business, Construction, Tourism, and more. Curated selection of quality press releases from trusted Romanian sources.</description>
-    <language>en</language>
-    <lastBuildDate>{rss_date}</lastBuildDate>
-    <pubDate>{rss_date}</pubDate>
-    <generator>Release Press Releases in Romania RSS Aggregator v2.0</generator>
-    <webMaster>noreply@release-press-releases-romania.github.io (Release Press Releases)</webMaster>
-    <managingEditor>noreply@release-press-releases-romania.github.io (Release Press Releases)</managingEditor>
-    <atom:link href="{BASE_URL}/feed.xml" rel="self" type="application/rss+xml"/>
-    <image>
-      <url>{BASE_URL}/assets/images/logo.svg</url>
-      <title>Release Press Releases in Romania</title>
-      <link>{BASE_URL}</link>
-      <width>144</width>
-      <height>144</height>
-    </image>
-    <category>Press Releases</category>
-    <category>Romania</category>
-    <category>News</category>
-    <category>Media</category>
-    <category>RSS Feed</category>
-    <ttl>60</ttl>
-    <sy:updatePeriod>hourly</sy:updatePeriod>
-    <sy:updateFrequency>1</sy:updateFrequency>
-    <copyright>Copyright {now.year} Release Press Releases in Romania. Content belongs to respective publishers.</copyright>
-    <docs>https://www.rssboard.org/rss-specification</docs>
-'''
-    
-    # Add items with enhanced metadata
-    for item in all_items:
-        pub_date = item['published'].strftime('%a, %d %b %Y %H:%M:%S %z')
-        title = html.escape(item['title'] or 'Untitled')
-        link = html.escape(item['link'] or '')
-        description = html.escape(item['description'] or '')
-        author = html.escape(item.get('author') or item['site_name'] or 'Unknown')
-        category = html.escape(item['category'] or 'Miscellaneous')
-        site_name = html.escape(item['site_name'] or 'Unknown')
-        site_slug = html.escape(item['site_slug'] or '')
-        site_url = html.escape(item.get('site_url', ''))
-        
-        # Enhanced description with context
-        enhanced_desc = description
-        if site_name and site_name != 'Unknown':
-            enhanced_desc = f"From {site_name}: {description}"
-        
-        # Use CDATA for description to handle special characters
-        description_cdata = f"<![CDATA[{enhanced_desc}]]>"
-        
-        # Generate GUID (use link as permalink)
-        guid = link if link else f"{BASE_URL}/publisher/{site_slug}/"
-        
-        rss_xml += f'''    <item>
-      <title>{title}</title>
-      <link>{link}</link>
-      <description>{description_cdata}</description>
-      <pubDate>{pub_date}</pubDate>
-      <author>{author} ({BASE_URL}/publisher/{site_slug}/)</author>
-      <dc:creator>{author}</dc:creator>
-      <dc:date>{item['published'].isoformat()}</dc:date>
-      <category domain="{BASE_URL}/category/">{category}</category>
-      <guid isPermaLink="true">{guid}</guid>
-      <source url="{BASE_URL}/publisher/{site_slug}/">{site_name}</source>
-'''
-        
-        # Add content:encoded if we have longer description
-        if len(description) > 200:
-            content_encoded = html.escape(enhanced_desc)
-            rss_xml += f'      <content:encoded><![CDATA[{enhanced_desc}]]></content:encoded>\n'
-        
-        # Add comments link if available
-        if link:
-            rss_xml += f'      <comments>{link}#comments</comments>\n'
-        
-        rss_xml += '    </item>\n'
+    print(f"  ✓ Processed {feeds_processed} feeds ({feeds_changed} changed)")
+    if feeds_cached:
+        print(f"  ⏱️  Time budget of {time_budget:g}s spent: {feeds_cached} feeds taken from the cache")
+    if state:
+        state.save()
+    if metrics:
+        metrics.write()
+    if _store:
+        if online:
+            _store.prune()
+        _store.close()
     
-    rss_xml += '''  </channel>
-</rss>'''
+    if offline and rss_unchanged(OUTPUT_FILE, all_items):
+        print(f"  ✓ Cached items unchanged, keeping {OUTPUT_FILE}")
+        return len(all_items), feeds_processed
+    if not offline and not feeds_changed and OUTPUT_FILE.exists():
+        print(f"  ✓ No feed changed, keeping {OUTPUT_FILE}")
+        return len(all_items), feeds_processed
+    print(f"  ✓ Collected {len(all_items)} items from {len(set(i.site_slug for i in all_items))} unique publishers")
     
-    # Write to file
-    OUTPUT_FILE.parent.mkdir(parents=True, exist_ok=True)
-    with open(OUTPUT_FILE, 'w', encoding='utf-8') as f:
-        f.write(rss_xml)
+    # Generate RSS XML with enhanced metadata
+    write_rss(OUTPUT_FILE, all_items)
     
     print(f"  ✓ RSS feed generated: {OUTPUT_FILE}")
-    print(f"  ✓ Feed contains {len(all_items)} items from {len(set(i['site_slug'] for i in all_items))} publishers")
-    print(f"  ✓ Categories represented: {len(set(i['category'] for i in all_items))}")
+    print(f"  ✓ Feed contains {len(all_items)} items from {len(set(i.site_slug for i in all_items))} publishers")
+    print(f"  ✓ Categories represented: {len(set(i.category for i in all_items))}")
     
     return len(all_items), feeds_processed
 
 if __name__ == '__main__':
+    import argparse
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--offline', action='store_true', help='build from data/feeds cache without network requests')
+    parser.add_argument('--replay', action='store_true', help='build from the stored raw responses without network requests')
+    parser.add_argument('--replay-at', metavar='ISO', help='replay the responses stored at or before this time')
+    parser.add_argument('--no-record', action='store_true', help="don't store the raw responses")
+    parser.add_argument('--time-budget', type=float, metavar='SECONDS', help='take the remaining feeds from the cache after this many seconds')
+    args = parser.parse_args()
     try:
-        items_count, feeds_count = generate_rss_feed()
+        items_count, feeds_count = generate_rss_feed(offline=args.offline, replay=args.replay,
+                                                     replay_at=args.replay_at, record=not args.no_record,
+                                                     time_budget=args.time_budget)
         print(f"\n✅ Success! Generated optimized RSS feed with {items_count} items from {feeds_count} feeds")
     except Exception as e:
         print(f"\n❌ Error: {e}")
@@ -1,77 +1,129 @@
 #!/usr/bin/env python3
 """
 Generate sitemap.xml and robots.txt for GitHub Pages.
+
+Every URL gets a real lastmod: a publisher page uses the newest item in
+data/feeds/<slug>.json, a category page the newest item of its publishers,
+and the home/directory pages the newest item overall. URLs without any
+dated item carry no lastmod. Files are only rewritten when their content
+changes, so an hourly run without new items leaves the sitemap alone.
+
+Past MAX_URLS_PER_SITEMAP URLs (the protocol limit), sitemap.xml becomes a
+sitemap index pointing at gzip-compressed sitemap-<n>.xml.gz children.
 """
 from __future__ import annotations
+import glob
+import gzip
 import json
 import os
-from datetime import datetime, timezone
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple, Union
 from xml.sax.saxutils import escape
 
+from catalog import LIGHT_FIELDS, SiteCatalog, as_catalog, category_slug
+from feed_writer import write_if_changed
+from normalize import parse_date, to_iso
+
 ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
 SITES_JSON = os.path.join(ROOT, "data", "sites.json")
+FEEDS_DIR = os.path.join(ROOT, "data", "feeds")
 
 BASE_URL = "https://release-press-releases-romania.github.io".rstrip("/")
+MAX_URLS_PER_SITEMAP = 50000
+SITEMAP_NS = "http://www.sitemaps.org/schemas/sitemap/0.9"
 
-def main() -> int:
-    with open(SITES_JSON, "r", encoding="utf-8") as f:
-        data = json.load(f)
-    sites = data.get("sites", [])
+def newest_item(slug: str) -> Optional[datetime]:
+    """Publication time of the newest item cached for `slug`."""
+    try:
+        with open(os.path.join(FEEDS_DIR, f"{slug}.json"), "r", encoding="utf-8") as f:
+            items = json.load(f).get("items") or []
+    except (OSError, ValueError, AttributeError):
+        return None
+    dates = [d for d in (parse_date(i.get("published")) for i in items) if d]
+    return max(dates, default=None)
 
-    # Get unique categories
-    categories = set()
-    for s in sites:
-        cat = s.get("category", "Miscellaneous")
-        categories.add(cat)
-    
-    # Category slug mapping (all categories are now in English)
-    cat_slug_map = {
-        "PR & Marketing": "pr-marketing",
-        "Health": "health",
-        "News & Society": "news-society",
-        "Technology & Energy": "technology-energy",
-        "Business": "business",
-        "Tourism & Delta": "tourism-delta",
-        "Construction & Home": "construction-home",
-        "Miscellaneous": "miscellaneous"
-    }
-    
-    urls = [
-        f"{BASE_URL}/",
-        f"{BASE_URL}/publishers/",
-        f"{BASE_URL}/category/",
-        f"{BASE_URL}/feed.xml",
+def newest(dates: List[Optional[datetime]]) -> Optional[datetime]:
+    return max((d for d in dates if d), default=None)
+
+def urlset(entries: List[Tuple[str, Optional[datetime]]]) -> str:
+    out = ['<?xml version="1.0" encoding="UTF-8"?>', f'<urlset xmlns="{SITEMAP_NS}">']
+    for loc, lastmod in entries:
+        out.append("  <url>")
+        out.append(f"    <loc>{escape(loc)}</loc>")
+        if lastmod:
+            out.append(f"    <lastmod>{to_iso(lastmod)}</lastmod>")
+        out.append("  </url>")
+    out.append("</urlset>")
+    return "\n".join(out) + "\n"
+
+def sitemap_index(children: List[Tuple[str, Optional[datetime]]]) -> str:
+    out = ['<?xml version="1.0" encoding="UTF-8"?>', f'<sitemapindex xmlns="{SITEMAP_NS}">']
+    for loc, lastmod in children:
+        out.append("  <sitemap>")
+        out.append(f"    <loc>{escape(loc)}</loc>")
+        if lastmod:
+            out.append(f"    <lastmod>{to_iso(lastmod)}</lastmod>")
+        out.append("  </sitemap>")
+    out.append("</sitemapindex>")
+    return "\n".join(out) + "\n"
+
+def write_sitemaps(entries: List[Tuple[str, Optional[datetime]]]) -> List[str]:
+    """Write sitemap.xml (and children when split); returns the files that changed."""
+    changed = []
+    children = []
+    if len(entries) > MAX_URLS_PER_SITEMAP:
+        for n, start in enumerate(range(0, len(entries), MAX_URLS_PER_SITEMAP), 1):
+            chunk = entries[start:start + MAX_URLS_PER_SITEMAP]
+            name = f"sitemap-{n}.xml.gz"
+            # mtime=0 keeps the gzip bytes stable for unchanged content
+            if write_if_changed(os.path.join(ROOT, name), gzip.compress(urlset(chunk).encode("utf-8"), mtime=0)):
+                changed.append(name)
+            children.append((name, newest([lastmod for _, lastmod in chunk])))
+        content = sitemap_index([(f"{BASE_URL}/{name}", lastmod) for name, lastmod in children])
+    else:
+        content = urlset(entries)
+    if write_if_changed(os.path.join(ROOT, "sitemap.xml"), content.encode("utf-8")):
+        changed.append("sitemap.xml")
+    # Children left over from a larger (or earlier split) sitemap
+    keep = {name for name, _ in children}
+    for path in sorted(glob.glob(os.path.join(ROOT, "sitemap-*.xml.gz"))):
+        if os.path.basename(path) not in keep:
+            os.remove(path)
+            changed.append(os.path.basename(path))
+    return changed
+
+def main(data: Union[SiteCatalog, Dict[str, Any], None] = None) -> int:
+    """Write sitemap.xml and robots.txt; `data` is an already loaded SiteCatalog or sites.json."""
+    catalog = as_catalog(data, SITES_JSON, LIGHT_FIELDS)
+    sites = catalog.sites
+
+    # Newest item per publisher and per category (first-seen category order)
+    site_dates = {s["slug"]: newest_item(s["slug"]) for s in sites}
+    categories = {cat: [site_dates[s["slug"]] for s in members] for cat, members in catalog.by_category.items()}
+    latest = newest(list(site_dates.values()))
+
+    entries = [
+        (f"{BASE_URL}/", latest),
+        (f"{BASE_URL}/publishers/", latest),
+        (f"{BASE_URL}/category/", latest),
+        (f"{BASE_URL}/feed.xml", latest),
     ]
-    
+
     # Add category pages (English slugs only)
-    for cat in categories:
-        cat_en = cat_slug_map.get(cat, cat.lower().replace(" ", "-").replace("&", ""))
-        urls.append(f"{BASE_URL}/category/{cat_en}/")
-    
+    for cat, dates in categories.items():
+        entries.append((f"{BASE_URL}/category/{category_slug(cat)}/", newest(dates)))
+
     # Add publisher pages
     for s in sites:
-        urls.append(f"{BASE_URL}/publisher/{s['slug']}/")
-
-    now = datetime.now(timezone.utc).date().isoformat()
-
-    sitemap = ['<?xml version="1.0" encoding="UTF-8"?>',
-               '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">']
-    for u in urls:
-        sitemap.append("  <url>")
-        sitemap.append(f"    <loc>{escape(u)}</loc>")
-        sitemap.append(f"    <lastmod>{now}</lastmod>")
-        sitemap.append("  </url>")
-    sitemap.append("</urlset>")
-    sitemap_xml = "\n".join(sitemap) + "\n"
+        entries.append((f"{BASE_URL}/publisher/{s['slug']}/", site_dates[s["slug"]]))
 
-    with open(os.path.join(ROOT, "sitemap.xml"), "w", encoding="utf-8") as f:
-        f.write(sitemap_xml)
+    changed = write_sitemaps(entries)
 
     robots = f"User-agent: *\nAllow: /\nSitemap: {BASE_URL}/sitemap.xml\n"
-    with open(os.path.join(ROOT, "robots.txt"), "w", encoding="utf-8") as f:
-        f.write(robots)
+    if write_if_changed(os.path.join(ROOT, "robots.txt"), robots.encode("utf-8")):
+        changed.append("robots.txt")
 
-    print(f"Generated sitemap.xml with {len(urls)} URLs")
+    print(f"Generated sitemap.xml with {len(entries)} URLs ({', '.join(changed) or 'unchanged'})")
     return 0
 
 if __name__ == "__main__":
@@ -0,0 +1,339 @@
+#!/usr/bin/env python3
+"""
+Render the listing pages from the site catalog: category/<slug>/index.html,
+category/index.html, publishers/index.html and index.html.
+
+The pages ship complete HTML: every publisher card, the category filter
+options, the counters and the category links are rendered here. The
+browser scripts (assets/app.js, assets/publishers-list.js) only filter,
+shuffle and page through the cards already in the page.
+
+Each page is a template in tools/templates/ (page_templates.py) and the
+head, nav and footer are shared fragments, rendered once per run by a
+FragmentCache. The hand-written text of each category (page intro, meta
+description, card on the category index, fallback card descriptions) is in
+tools/templates/categories.json, keyed by category name.
+
+Per-card random choices (rel="nofollow" on a share of the outbound links)
+are drawn from a generator seeded by the slug, so a run only changes pages
+whose data changed. Files are rewritten only when
+their bytes change, and category pages of categories no longer in
+sites.json are deleted.
+
+Usage: python tools/listing_pages.py
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import random
+import re
+from html import escape
+from typing import Any, Dict, List, Optional, Union
+from urllib.parse import quote
+
+from catalog import DEFAULT_CATEGORY, ROOT, SITES_JSON, SiteCatalog, as_catalog, category_slug, site_seed
+from feed_writer import remove_stale_pages, write_if_changed
+from page_templates import FragmentCache, load_category_text, ordered_categories, render_template
+
+BASE_URL = "https://release-press-releases-romania.github.io"
+
+HOME_INITIAL_CARDS = 20    # assets/app.js shows the others with "Load more"
+HOME_CHIPS = 5
+
+# Text of a category missing from categories.json
+DEFAULT_TEXT = {
+    "icon": "icon-misc",
+    "subtitle": "",
+    "features": [],
+    "fallback_long": "A platform providing press releases and content across various topics. "
+                     "Access RSS feeds for the latest updates and information.",
+    "fallback_short": "Press releases and content.",
+}
+
+_LEADING_SUBJECT = re.compile(r"^(This platform|The platform|The site|This site)\s+", re.I)
+def category_text(texts: Dict[str, Dict[str, Any]], category: str) -> Dict[str, Any]:
+    """The hand-written text of `category`, with defaults for missing keys."""
+    generic = f"{category} press releases from Romanian publishers."
+    return {**DEFAULT_TEXT, "description": generic, "intro": generic, "summary": generic, **texts.get(category, {})}
+
+def domain_name(site: Dict[str, Any]) -> str:
+    """The site's URL without scheme and trailing slash, as the cards show it."""
+    return re.sub(r"^https?://", "", site["url"]).rstrip("/")
+
+def card_description(site: Dict[str, Any], fields: List[str], min_length: int, fallback: str) -> str:
+    """First description of `fields`, with the site's own name replaced, or `fallback` if too short."""
+    desc = next((site[k] for k in fields if site.get(k)), "")
+    name = site.get("name") or site["slug"]
+    desc = re.sub(rf"\b{re.escape(name)}\b", "This platform", desc, flags=re.I)
+    desc = _LEADING_SUBJECT.sub("", desc)
+    return desc if len(desc) >= min_length else fallback
+
+def text(value: str) -> str:
+    """Escape `value` for use as element content (escape() is for attribute values)."""
+    return escape(value, quote=False)
+
+def json_ld(obj: Any) -> str:
+    """JSON for a <script type="application/ld+json"> element."""
+    return json.dumps(obj, ensure_ascii=False).replace("</", "<\\/")
+
+def plural(n: int, word: str) -> str:
+    return f"{n} {word}" if n == 1 else f"{n} {word}s"
+
+def rel(rng: random.Random, nofollow_share: float) -> str:
+    return "nofollow noopener" if rng.random() < nofollow_share else "noopener"
+
+class ListingPages:
+    """Renders the listing pages of one catalog."""
+
+    def __init__(self, catalog: SiteCatalog, texts: Optional[Dict[str, Dict[str, Any]]] = None) -> None:
+        self.catalog = catalog
+        self.texts = texts if texts is not None else load_category_text()
+        self.base_url = (catalog.base_url or BASE_URL).rstrip("/")
+        self.categories = ordered_categories(catalog, self.texts)
+        self.fragments = FragmentCache()
+
+    def about(self, category: str) -> Dict[str, Any]:
+        return category_text(self.texts, category)
+
+    def chrome(self) -> Dict[str, str]:
+        """The shared fragments, from the fragment cache."""
+        return {
+            "head": self.fragments.get("_head.html"),
+            "nav": self.fragments.get("_nav.html"),
+            "footer": self.fragments.footer(self.categories),
+        }
+
+    def category_options(self) -> str:
+        by_category = self.catalog.by_category
+        return "\n".join(f'          <option value="{escape(c)}">{text(c)} ({len(by_category[c])})</option>'
+                         for c in sorted(by_category))
+
+    # category/<slug>/index.html
+
+    def category_page(self, category: str) -> str:
+        slug = category_slug(category)
+        about = self.about(category)
+        canonical = f"{self.base_url}/category/{slug}/"
+        keywords = f"{category.lower()}, press releases, Romanian publishers"
+        items = []
+        for site in self.catalog.by_category[category]:
+            desc = next((site[k] for k in ("description_long_en", "description_short_en", "description_long",
+                                           "description_short") if site.get(k)), about["fallback_long"])
+            items.append(f"""        <a class="site" href="/publisher/{quote(site['slug'])}/">
+          <div class="site-top">
+            <div>
+              <p class="site-name">{text(site.get('name') or site['slug'])}</p>
+              <p class="site-desc">{text(desc)}</p>
+            </div>
+          </div>
+        </a>""")
+        return render_template(
+            "category.html", **self.chrome(),
+            name=text(category), slug=slug, canonical=canonical,
+            title=text(f"{category} Press Releases — Release Press Releases"),
+            description=escape(about["description"]), keywords=escape(keywords), intro=text(about["intro"]),
+            jsonld=json_ld({"@context": "https://schema.org", "@type": "CollectionPage",
+                            "name": f"{category} — Release Press Releases", "url": canonical,
+                            "description": about["description"], "inLanguage": "en", "keywords": keywords}),
+            site_list="\n".join(items))
+
+    # category/index.html
+
+    def categories_page(self) -> str:
+        cards, itemlist = [], []
+        for position, category in enumerate(self.categories, 1):
+            slug = category_slug(category)
+            about = self.about(category)
+            name = escape(category)
+            features = "\n".join(f"        <li>{text(f)}</li>" for f in about["features"])
+            cards.append(f"""    <article class="category-card" itemscope itemtype="https://schema.org/Thing">
+      <div class="category-header">
+        <div class="category-icon" aria-hidden="true">
+          <svg viewBox="0 0 24 24" fill="none" stroke="currentColor" stroke-width="2">
+            <use href="/assets/icons/category-icons.svg#{about['icon']}"></use>
+          </svg>
+        </div>
+        <div class="category-title-wrapper">
+          <h2 class="category-title" itemprop="name">
+            <a href="/category/{slug}/" itemprop="url">{text(category)}</a>
+          </h2>
+          <p class="category-subtitle">{text(about['subtitle'])}</p>
+        </div>
+      </div>
+      <p class="category-description" itemprop="description">
+        {text(about['summary'])}
+      </p>
+      <ul class="category-features">
+{features}
+      </ul>
+      <div class="category-footer">
+        <span class="category-count">{plural(len(self.catalog.by_category[category]), 'publisher')}</span>
+        <a href="/category/{slug}/" class="category-btn" aria-label="View {name} category">View Category</a>
+      </div>
+      <meta itemprop="category" content="{name}">
+    </article>""")
+            itemlist.append("        " + json_ld({"@type": "ListItem", "position": position, "name": category,
+                                                 "url": f"{self.base_url}/category/{slug}/"}))
+        counts = ", ".join(f"{c} ({plural(len(self.catalog.by_category[c]), 'publisher')})" for c in self.categories)
+        return render_template(
+            "categories.html", **self.chrome(),
+            description=escape(f"Browse press releases organized by category: {counts}. "
+                               f"{len(self.catalog)} Romanian publishers."),
+            category_total=len(self.categories),
+            category_itemlist=",\n".join(itemlist),
+            category_cards="\n\n".join(cards))
+
+    # publishers/index.html
+
+    def directory_card(self, site: Dict[str, Any]) -> str:
+        rng = random.Random(site_seed(site["slug"]))
+        category = site.get("category") or DEFAULT_CATEGORY
+        about = self.about(category)
+        cat = escape(category)
+        domain = escape(domain_name(site))
+        rss, mastodon = site.get("rss"), site.get("mastodon")
+        desc = card_description(site, ["description_long_en", "description_short_en", "description_long",
+                                       "description_short"], 50, about["fallback_long"])
+        search = " ".join([site.get("name") or "", site["url"], site["slug"], category,
+                           site.get("description_short_en") or "", site.get("description_short") or ""]).lower()
+        tags = []
+        if rss:
+            tags.append(f'<a href="{escape(rss)}" target="_blank" class="tag rss" aria-label="RSS feed for {domain}" '
+                        f'rel="{rel(rng, 0.2)}">RSS</a>')
+        if mastodon:
+            tags.append(f'<a href="{escape(mastodon)}" target="_blank" class="tag social" '
+                        f'aria-label="Mastodon profile for {domain}" rel="{rel(rng, 0.3)}">Mastodon</a>')
+        tags.append(f'<a href="/category/{category_slug(category)}/" class="tag" aria-label="Category: {cat}" '
+                    f'rel="bookmark">{cat}</a>')
+        links = [f'<link itemprop="sameAs" href="{escape(site["url"])}">']
+        if rss:
+            links.append(f'<link itemprop="rss" href="{escape(rss)}">')
+        return f"""      <article class="site" itemscope itemtype="https://schema.org/Organization" data-category="{cat}"{' data-social="1"' if mastodon else ''} data-search="{escape(search)}">
+        <div class="site-header">
+          <div class="site-image-wrapper">
+            <svg class="site-icon" aria-hidden="true" width="40" height="40" viewBox="0 0 24 24" fill="none" stroke="currentColor" stroke-width="2">
+              <use href="/assets/icons/category-icons.svg#{about['icon']}"></use>
+            </svg>
+          </div>
+          <a href="{escape(site['url'])}" target="_blank" class="site-external-link" aria-label="Visit {domain} website" rel="{rel(rng, 0.3)}" title="Visit {domain}">
+            <svg width="16" height="16" viewBox="0 0 24 24" fill="none" stroke="currentColor" stroke-width="2" aria-hidden="true">
+              <path d="M18 13v6a2 2 0 0 1-2 2H5a2 2 0 0 1-2-2V8a2 2 0 0 1 2-2h6"></path>
+              <polyline points="15 3 21 3 21 9"></polyline>
+              <line x1="10" y1="14" x2="21" y2="3"></line>
+            </svg>
+          </a>
+        </div>
+        <a href="/publisher/{quote(site['slug'])}/" itemprop="url" rel="bookmark" aria-label="View {domain} publisher page and press releases" class="site-link">
+          <h3 class="site-name" itemprop="name">{domain}</h3>
+          <p class="site-desc" itemprop="description">{text(desc)}</p>
+        </a>
+        <div class="site-meta" aria-label="Publisher metadata">{" ".join(tags)}</div>
+        <meta itemprop="category" content="{cat}">
+        {" ".join(links)}
+      </article>"""
+
+    def publishers_page(self) -> str:
+        return render_template(
+            "publishers.html", **self.chrome(),
+            category_options=self.category_options(),
+            site_total=len(self.catalog),
+            site_cards="\n".join(self.directory_card(s) for s in self.catalog))
+
+    # index.html
+
+    def home_card(self, site: Dict[str, Any], hidden: bool) -> str:
+        rng = random.Random(site_seed(site["slug"]))
+        category = site.get("category") or DEFAULT_CATEGORY
+        about = self.about(category)
+        cat = escape(category)
+        domain = escape(domain_name(site))
+        mastodon = site.get("mastodon")
+        desc = card_description(site, ["description_small_en", "description_short_en", "description_small",
+                                       "description_short"], 30, about["fallback_short"])
+        search = " ".join([site.get("name") or "", site["url"], site["slug"], category,
+                           site.get("description_small_en") or "", site.get("description_small") or ""]).lower()
+        tags = []
+        if site.get("rss"):
+            tags.append('<span class="tag rss" aria-label="Has RSS feed">RSS</span>')
+        if mastodon:
+            tags.append('<span class="tag social" aria-label="Has Mastodon profile">Mastodon</span>')
+        tags.append(f'<span class="tag" aria-label="Category: {cat}">{cat}</span>')
+        links = [f'<link itemprop="sameAs" href="{escape(site["url"])}">']
+        if site.get("rss"):
+            links.append(f'<link itemprop="rss" href="{escape(site["rss"])}">')
+        return f"""      <article class="site" itemscope itemtype="https://schema.org/Organization" aria-label="{domain} publisher" data-category="{cat}"{' data-social="1"' if mastodon else ''} data-search="{escape(search)}"{' hidden' if hidden else ''}>
+        <a href="/publisher/{quote(site['slug'])}/" itemprop="url" rel="bookmark" aria-label="View {domain} publisher page and press releases" class="site-link">
+          <div class="site-top">
+            <div class="site-image-wrapper">
+              <svg class="site-icon" aria-hidden="true" width="48" height="48" viewBox="0 0 24 24" fill="none" stroke="currentColor" stroke-width="2">
+                <use href="/assets/icons/category-icons.svg#{about['icon']}"></use>
+              </svg>
+            </div>
+            <div class="site-content">
+              <h3 class="site-name" itemprop="name">{domain}</h3>
+              <p class="site-desc" itemprop="description">{text(desc)}</p>
+              <div class="site-meta" aria-label="Publisher metadata">{" ".join(tags)}</div>
+            </div>
+          </div>
+        </a>
+        <a href="{escape(site['url'])}" target="_blank" class="site-image-link" aria-label="Visit {domain} website" rel="{rel(rng, 0.3)}">
+          <img src="/assets/images/logo.svg" alt="{domain} - Press Releases" class="site-logo" loading="lazy" width="32" height="32" itemprop="logo">
+        </a>
+        <meta itemprop="category" content="{cat}">
+        {" ".join(links)}
+      </article>"""
+
+    def home_page(self) -> str:
+        by_category = self.catalog.by_category
+        top = sorted(sorted(by_category), key=lambda c: -len(by_category[c]))[:HOME_CHIPS]
+        chips = "\n".join(
+            f'      <a href="/category/{category_slug(c)}/" class="pill{" green" if "Technology" in c or "Energy" in c else ""}">'
+            f'<i></i>{text(c)} <small>· {len(by_category[c])}</small></a>' for c in top)
+        links = "\n".join(f'      <a class="category-btn" href="/category/{category_slug(c)}/">{text(c)}</a>'
+                          for c in self.categories)
+        return render_template(
+            "home.html", **self.chrome(),
+            category_chips=chips,
+            site_total=len(self.catalog),
+            mastodon_total=len(self.catalog.with_mastodon),
+            category_total=len(by_category),
+            category_options=self.category_options(),
+            site_cards="\n".join(self.home_card(s, n >= HOME_INITIAL_CARDS) for n, s in enumerate(self.catalog)),
+            category_links=links)
+
+    def pages(self) -> Dict[str, str]:
+        """Path relative to ROOT -> HTML, for every listing page."""
+        out = {f"category/{category_slug(c)}/index.html": self.category_page(c) for c in self.categories}
+        out["category/index.html"] = self.categories_page()
+        out["publishers/index.html"] = self.publishers_page()
+        out["index.html"] = self.home_page()
+        return out
+
+def write_listing_pages(data: Union[SiteCatalog, Dict[str, Any], None] = None) -> Dict[str, int]:
+    """Render and write every listing page; returns counts of written/unchanged/removed pages."""
+    renderer = ListingPages(as_catalog(data, SITES_JSON))
+    written = unchanged = 0
+    for rel_path, html in renderer.pages().items():
+        path = os.path.join(ROOT, rel_path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        if write_if_changed(path, html.encode("utf-8")):
+            written += 1
+        else:
+            unchanged += 1
+    # Category pages of categories no longer in sites.json
+    removed = remove_stale_pages(os.path.join(ROOT, "category"), {category_slug(c) for c in renderer.categories})
+    return {"written": written, "unchanged": unchanged, "removed": len(removed),
+            "fragment_renders": renderer.fragments.misses, "fragment_hits": renderer.fragments.hits}
+
+def main(argv: Optional[list] = None, data: Union[SiteCatalog, Dict[str, Any], None] = None) -> int:
+    ap = argparse.ArgumentParser(description="Render the category, publishers and home pages from data/sites.json.")
+    ap.parse_args(argv)
+    stats = write_listing_pages(data)
+    print(f"Listing pages: {stats['written']} written, {stats['unchanged']} unchanged, {stats['removed']} removed "
+          f"({stats['fragment_renders']} fragment renders, {stats['fragment_hits']} reused)")
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Date and text normalization shared by the feed tools.
+
+- parse_date() turns RFC 822 / ISO 8601 strings into aware UTC datetimes, or
+  None when a date can't be understood (callers must not invent one). The
+  parser that handled a date's *shape* (digits and letters masked) is
+  memoized, so a feed whose dates all look alike costs one attempt per date.
+- html_to_text() makes a single pass over markup: it drops tags, comments and
+  script/style blocks, decodes entities and collapses whitespace, and stops as
+  soon as `limit` characters have been produced.
+- fold() lower-cases text and strips diacritics (ș/ş -> s, ț/ţ -> t, ă/â -> a,
+  î -> i), so spelling variants of Romanian text compare equal.
+- Item is the compact __slots__ record for one feed item; to_dict() gives the
+  JSON shape stored in data/feeds/<slug>.json (compact=True drops the fields
+  readers can derive: published_human and the per-item source).
+"""
+from __future__ import annotations
+
+import re
+import string
+import unicodedata
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from html import unescape
+from typing import Any, Callable, Dict, List, Optional
+
+TITLE_LIMIT = 180
+SUMMARY_LIMIT = 800
+
+def _rfc822(value: str) -> datetime:
+    return parsedate_to_datetime(value)
+
+def _iso(value: str) -> datetime:
+    return datetime.fromisoformat(value)
+
+def _legacy(value: str) -> datetime:
+    for fmt in ("%a, %d %b %Y %H:%M:%S %Z", "%d %b %Y %H:%M:%S %z", "%Y-%m-%dT%H:%M:%S.%f%z"):
+        try:
+            return datetime.strptime(value, fmt)
+        except ValueError:
+            continue
+    raise ValueError(value)
+
+DATE_PARSERS: List[Callable[[str], datetime]] = [_rfc822, _iso, _legacy]
+_SHAPE = str.maketrans(string.digits + string.ascii_letters, "9" * 10 + "a" * 52)
+_shape_cache: Dict[str, int] = {}
+
+def parse_date(value: Optional[str]) -> Optional[datetime]:
+    """Parse a feed date to an aware UTC datetime, or None."""
+    value = (value or "").strip()
+    if not value:
+        return None
+    shape = value.translate(_SHAPE)
+    known = _shape_cache.get(shape)
+    order = range(len(DATE_PARSERS)) if known is None else [known] + [i for i in range(len(DATE_PARSERS)) if i != known]
+    for i in order:
+        try:
+            dt = DATE_PARSERS[i](value)
+        except (TypeError, ValueError, IndexError, OverflowError):
+            continue
+        if len(_shape_cache) > 4096:
+            _shape_cache.clear()
+        _shape_cache[shape] = i
+        if dt.tzinfo is None:
+            dt = dt.replace(tzinfo=timezone.utc)
+        return dt.astimezone(timezone.utc)
+    return None
+
+def to_iso(dt: Optional[datetime]) -> Optional[str]:
+    return dt.replace(microsecond=0).isoformat() if dt else None
+
+def human_date(dt_str: Optional[str]) -> str:
+    return (dt_str or "")[:16].strip()
+
+def fold(text: str) -> str:
+    """Lower-case `text` and strip diacritics (ș and ş both become s)."""
+    decomposed = unicodedata.normalize("NFKD", text.lower())
+    return "".join(c for c in decomposed if not unicodedata.combining(c))
+
+_MARKUP = re.compile(r"<(script|style)\b.*?</\1\s*>|<!--.*?-->|<[^>]*>|[^<]+|<", re.S | re.I)
+
+def html_to_text(s: Optional[str], limit: Optional[int] = None) -> str:
+    """Plain text of an HTML fragment, cut to `limit` characters."""
+    out: List[str] = []
+    size = 0
+    space = False
+    for m in _MARKUP.finditer(s or ""):
+        chunk = m.group()
+        if chunk[0] == "<" and len(chunk) > 1:
+            space = True   # tags separate words
+            continue
+        text = unescape(chunk)
+        if text[:1].isspace():
+            space = True
+        words = text.split()
+        if words:
+            if space and out:
+                out.append(" ")
+                size += 1
+            joined = " ".join(words)
+            out.append(joined)
+            size += len(joined)
+            if limit is not None and size >= limit:
+                break
+        space = text[-1:].isspace()
+    text = "".join(out)
+    return text[:limit] if limit is not None else text
+
+class Item:
+    """One feed item. Site fields are filled in by the aggregating tools."""
+
+    __slots__ = ("title", "link", "summary", "published", "source",
+                 "site_slug", "site_name", "site_url", "category", "alternates")
+
+    def __init__(self, title: str, link: str, summary: str = "", published: Optional[datetime] = None,
+                 source: str = "") -> None:
+        self.title = title
+        self.link = link
+        self.summary = summary
+        self.published = published
+        self.source = source
+        self.site_slug = self.site_name = self.site_url = self.category = None
+        self.alternates: List["Item"] = []   # syndicated copies, see dedup.py
+
+    @classmethod
+    def from_markup(cls, title: str, link: str, summary: str, published: Optional[datetime], source: str) -> "Item":
+        """Build an item from raw feed fields (HTML title/summary)."""
+        return cls(html_to_text(title, TITLE_LIMIT) or "Update", (link or "").strip(),
+                   html_to_text(summary, SUMMARY_LIMIT), published, source)
+
+    @classmethod
+    def from_dict(cls, d: Dict[str, Any]) -> "Item":
+        return cls(d.get("title") or "", d.get("link") or "", d.get("summary") or "",
+                   parse_date(d.get("published")), d.get("source") or "")
+
+    def to_dict(self, compact: bool = False) -> Dict[str, Any]:
+        published = to_iso(self.published)
+        if compact:
+            return {"title": self.title, "link": self.link, "summary": self.summary, "published": published}
+        return {
+            "title": self.title,
+            "link": self.link,
+            "summary": self.summary,
+            "published": published,
+            "published_human": human_date(published),
+            "source": self.source,
+        }
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, Item) and self.to_dict() == other.to_dict()
+
+    def __repr__(self) -> str:
+        return f"Item({self.title!r}, {self.link!r}, published={to_iso(self.published)!r})"
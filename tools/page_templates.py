@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+HTML templates of the generated pages (tools/templates/) and the cache of
+the fragments they share.
+
+Templates are plain HTML with {{ name }} placeholders, replaced by the
+values given to render(). Values are inserted as they are: callers escape
+text (html.escape) and build markup. A placeholder without a value raises
+TemplateError, so a typo doesn't ship an empty section. The placeholders
+are not ${name} (string.Template) because the pages' inline scripts use JS
+template literals.
+
+Files named _*.html are fragments shared by every page: _head.html,
+_nav.html, _footer.html. FragmentCache renders each fragment once per set
+of parameters and hands the same string to every page of a run, so adding
+pages doesn't add fragment renders. FragmentCache.footer() is the footer of
+both the listing and the publisher pages, linking every category in
+ordered_categories() order (categories.json first).
+
+Templates are read once per process (load_template). templates_hash()
+covers every file of TEMPLATE_DIR and this module, for build.py.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import re
+from functools import lru_cache
+from html import escape
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+from catalog import SiteCatalog, category_slug
+
+TEMPLATE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "templates")
+CATEGORY_TEXT_JSON = os.path.join(TEMPLATE_DIR, "categories.json")
+
+FOOTER_CATEGORIES = 5      # the rest go under "More Categories"
+_FOOTER_LINK = ('            <a href="/category/{slug}/" style="color: var(--muted); text-decoration: none; '
+                'font-size: 14px; transition: color 0.2s;">{name}</a>')
+
+PLACEHOLDER = re.compile(r"\{\{\s*([a-z_][a-z0-9_]*)\s*\}\}")
+
+class TemplateError(ValueError):
+    """A template placeholder has no value."""
+
+@lru_cache(maxsize=None)
+def load_template(name: str) -> str:
+    """Text of TEMPLATE_DIR/`name`; fragments lose their final newline."""
+    with open(os.path.join(TEMPLATE_DIR, name), "r", encoding="utf-8") as f:
+        text = f.read()
+    return text.rstrip("\n") if name.startswith("_") else text
+
+def render(template: str, context: Mapping[str, Any]) -> str:
+    """`template` with every {{ name }} replaced by str(context[name])."""
+    def value(m: "re.Match[str]") -> str:
+        try:
+            return str(context[m.group(1)])
+        except KeyError:
+            raise TemplateError(f"no value for {{{{ {m.group(1)} }}}}") from None
+    return PLACEHOLDER.sub(value, template)
+
+def render_template(template_name: str, /, **context: Any) -> str:
+    return render(load_template(template_name), context)
+
+def load_category_text(path: Optional[str] = None) -> Dict[str, Dict[str, Any]]:
+    """The hand-written text of each category (categories.json), keyed by category name."""
+    with open(path or CATEGORY_TEXT_JSON, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def ordered_categories(catalog: SiteCatalog, texts: Dict[str, Dict[str, Any]]) -> List[str]:
+    """Categories with sites: those of categories.json in its order, then the others by name."""
+    known = [c for c in texts if c in catalog.by_category]
+    return known + sorted(c for c in catalog.by_category if c not in texts)
+
+class FragmentCache:
+    """Fragments rendered once per (name, parameters) and reused."""
+
+    def __init__(self) -> None:
+        self._rendered: Dict[Tuple[str, Tuple[Tuple[str, str], ...]], str] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, fragment: str, /, **params: Any) -> str:
+        key = (fragment, tuple(sorted((k, str(v)) for k, v in params.items())))
+        html = self._rendered.get(key)
+        if html is None:
+            self.misses += 1
+            html = self._rendered[key] = render_template(fragment, **params)
+        else:
+            self.hits += 1
+        return html
+
+    def footer(self, categories: List[str]) -> str:
+        """_footer.html linking `categories`, the first FOOTER_CATEGORIES under "Categories"."""
+        links = [_FOOTER_LINK.format(slug=category_slug(c), name=escape(c, quote=False)) for c in categories]
+        return self.get("_footer.html", categories="\n".join(links[:FOOTER_CATEGORIES]),
+                        more_categories="\n".join(links[FOOTER_CATEGORIES:]))
+
+def templates_hash() -> str:
+    """Hash of the template files and of this module."""
+    h = hashlib.sha256()
+    paths = [os.path.join(TEMPLATE_DIR, n) for n in sorted(os.listdir(TEMPLATE_DIR))] + [os.path.abspath(__file__)]
+    for path in paths:
+        h.update(os.path.basename(path).encode("utf-8") + b"\0")
+        with open(path, "rb") as f:
+            h.update(f.read())
+    return h.hexdigest()[:32]
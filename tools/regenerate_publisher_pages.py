@@ -2,50 +2,55 @@
 """
 Regenerate all publisher pages with English text.
 This script reads sites.json and regenerates all publisher HTML pages with English content.
+
+Sites come grouped by category from the SiteCatalog (catalog.py), and the related
+publishers of a page are a sample seeded by its slug, so a run only changes
+pages whose data changed. The footer is the shared tools/templates/_footer.html
+(page_templates.FragmentCache), rendered once per run. Pages are rendered
+and written by a process pool.
+
+The build is incremental: data/publisher-pages-manifest.json stores, per
+page, a hash of its inputs (its site record, the records of its related
+publishers, the footer and TEMPLATE_VERSION). Only pages whose hash changed, or whose
+file is missing, are rendered; pages of slugs removed from sites.json are
+deleted. Bump TEMPLATE_VERSION when generate_publisher_page() changes, or
+run with --force.
 """
 
+import argparse
+import hashlib
 import json
 import os
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from html import escape
 import random
 
+from catalog import as_catalog, category_slug, site_seed
+from feed_writer import remove_stale_pages, write_if_changed
+from page_templates import FragmentCache, load_category_text, ordered_categories
+
 ROOT = Path(__file__).parent.parent
 SITES_JSON = ROOT / "data" / "sites.json"
+MANIFEST_JSON = ROOT / "data" / "publisher-pages-manifest.json"
 BASE_URL = "https://release-press-releases-romania.github.io"
+TEMPLATE_VERSION = 2  # bump whenever the page markup changes
 
-# Category name mapping (for display)
-CATEGORY_NAMES = {
-    "PR & Marketing": "PR & Marketing",
-    "Health": "Health",
-    "News & Society": "News & Society",
-    "Technology & Energy": "Technology & Energy",
-    "Business": "Business",
-    "Tourism & Delta": "Tourism & Delta",
-    "Construction & Home": "Construction & Home",
-    "Miscellaneous": "Miscellaneous"
-}
-
-# Category slug mapping
-CATEGORY_SLUGS = {
-    "PR & Marketing": "pr-marketing",
-    "Health": "health",
-    "News & Society": "news-society",
-    "Technology & Energy": "technology-energy",
-    "Business": "business",
-    "Tourism & Delta": "tourism-delta",
-    "Construction & Home": "construction-home",
-    "Miscellaneous": "miscellaneous"
-}
-
-def get_related_publishers(sites, current_site, category, limit=6):
-    """Get related publishers from the same category."""
-    related = [s for s in sites if s.get('category') == category and s.get('slug') != current_site.get('slug')]
-    random.shuffle(related)
-    return related[:limit]
+def get_related_publishers(category_index, current_site, category, limit=6):
+    """Get related publishers from the same category.
+    
+    The sample is seeded by the current slug, so it is the same on every run
+    as long as the category's publishers don't change.
+    """
+    peers = category_index.get(category, [])
+    slug = current_site.get('slug')
+    rng = random.Random(site_seed(slug or ''))
+    # One extra pick covers the current site being drawn
+    picked = rng.sample(peers, min(limit + 1, len(peers)))
+    return [s for s in picked if s.get('slug') != slug][:limit]
 
-def generate_publisher_page(site, all_sites):
-    """Generate HTML page for a publisher."""
+def generate_publisher_page(site, category_index, footer):
+    """Generate HTML page for a publisher; `footer` is the rendered footer fragment."""
     slug = site['slug']
     name = site.get('name', slug)
     url = site.get('url', '')
@@ -53,7 +58,7 @@ def generate_publisher_page(site, all_sites):
     mastodon = site.get('mastodon') or ''
     mastodon_rss = site.get('mastodon_rss') or ''
     category = site.get('category', 'Miscellaneous')
-    category_slug = CATEGORY_SLUGS.get(category, category.lower().replace(' ', '-'))
+    cat_slug = category_slug(category)
     
     # Use English descriptions
     description_long = site.get('description_long_en', site.get('description_long', ''))
@@ -69,7 +74,7 @@ def generate_publisher_page(site, all_sites):
     meta_description = description_short or description_small or f"{name} - press releases from {category.lower()} category."
     
     # Get related publishers
-    related = get_related_publishers(all_sites, site, category)
+    related = get_related_publishers(category_index, site, category)
     
     # Build related publishers HTML with better internal linking
     related_html = ''
@@ -92,15 +97,15 @@ def generate_publisher_page(site, all_sites):
         related_html = f'''
   <section class="card" style="margin-top:20px">
     <div class="card-head">
-      <h2>Other Press Release Publishers from {escape(CATEGORY_NAMES.get(category, category))}</h2>
-      <small><a href="/category/{category_slug}/" style="color: #4338ca; text-decoration: underline;">View all {len(related)} publishers in this category →</a></small>
+      <h2>Other Press Release Publishers from {escape(category)}</h2>
+      <small><a href="/category/{cat_slug}/" style="color: #4338ca; text-decoration: underline;">View all {len(related)} publishers in this category →</a></small>
     </div>
     <div class="card-body">
       <div style="display: grid; grid-template-columns: repeat(auto-fill, minmax(280px, 1fr)); gap: 16px;">
         {''.join(related_items[:6])}
       </div>
       <div style="margin-top: 20px; text-align: center;">
-        <a href="/category/{category_slug}/" class="btn" style="padding: 10px 20px;">View all {escape(CATEGORY_NAMES.get(category, category))} publishers</a>
+        <a href="/category/{cat_slug}/" class="btn" style="padding: 10px 20px;">View all {escape(category)} publishers</a>
         <a href="/publishers/" class="btn" style="padding: 10px 20px; margin-left: 12px;">Browse all publishers</a>
       </div>
     </div>
@@ -184,7 +189,7 @@ def generate_publisher_page(site, all_sites):
 
   <div class="container">
   <div class="breadcrumb">
-    <a href="/">Home</a> <span>›</span> <a href="/publishers/">Publishers</a> <span>›</span> <a href="/category/{category_slug}/">{escape(CATEGORY_NAMES.get(category, category))}</a> <span>›</span> <span>{escape(name)}</span>
+    <a href="/">Home</a> <span>›</span> <a href="/publishers/">Publishers</a> <span>›</span> <a href="/category/{cat_slug}/">{escape(category)}</a> <span>›</span> <span>{escape(name)}</span>
   </div>
 
   <div class="hero" style="padding:28px 24px">
@@ -193,7 +198,7 @@ def generate_publisher_page(site, all_sites):
       {escape(description_long or description_short or description_small or f"{name} provides press releases and news from the {category.lower()} category. Access the latest press releases, news updates, and media content through our RSS feed integration and online platform.")}
     </p>
     <div class="pills" style="margin-top:16px">
-      <span class="pill"><i></i>{escape(CATEGORY_NAMES.get(category, category))}</span>
+      <span class="pill"><i></i>{escape(category)}</span>
       {''.join([f'<span class="pill green"><i></i>{escape(kw)}</span>' for kw in keywords_list[:4]]) if keywords_list else ''}
     </div>
   </div>
@@ -201,7 +206,7 @@ def generate_publisher_page(site, all_sites):
   <section class="card" style="margin-top:20px">
       <div class="card-head">
       <h2>About {escape(name)}</h2>
-      <small><a href="/category/{category_slug}/" style="color: #4338ca; text-decoration: underline;">View category {escape(CATEGORY_NAMES.get(category, category))}</a></small>
+      <small><a href="/category/{cat_slug}/" style="color: #4338ca; text-decoration: underline;">View category {escape(category)}</a></small>
     </div>
     <div class="card-body">
       <p style="line-height:1.85; color: rgba(17,20,37,.85); margin:0; font-size:16px;">
@@ -210,11 +215,11 @@ def generate_publisher_page(site, all_sites):
       <div style="margin-top:20px; padding-top:20px; border-top:1px solid var(--border);">
         <p style="margin:0 0 12px 0; font-size:15px; color: var(--muted);">
           <strong>Website:</strong> <a href="{escape(url)}" target="_blank" rel="noopener" style="color: #4338ca; text-decoration: underline;">{escape(url.replace('https://', '').replace('http://', '').rstrip('/'))}</a> | 
-          <strong>Category:</strong> <a href="/category/{category_slug}/" style="color: #4338ca; text-decoration: underline;">{escape(CATEGORY_NAMES.get(category, category))}</a> | 
+          <strong>Category:</strong> <a href="/category/{cat_slug}/" style="color: #4338ca; text-decoration: underline;">{escape(category)}</a> | 
           <strong>RSS Feed:</strong> <a href="{escape(rss)}" target="_blank" rel="nofollow noopener" style="color: #4338ca; text-decoration: underline;">Subscribe</a>
         </p>
         <p style="margin:0; font-size:14px; color: var(--muted); line-height:1.6;">
-          Explore more publishers in the <a href="/category/{category_slug}/" style="color: #4338ca; text-decoration: underline;">{escape(CATEGORY_NAMES.get(category, category))} category</a>, browse our <a href="/publishers/" style="color: #4338ca; text-decoration: underline;">complete publisher directory</a>, or return to the <a href="/" style="color: #4338ca; text-decoration: underline;">homepage</a> to discover more press release sources from Romania.
+          Explore more publishers in the <a href="/category/{cat_slug}/" style="color: #4338ca; text-decoration: underline;">{escape(category)} category</a>, browse our <a href="/publishers/" style="color: #4338ca; text-decoration: underline;">complete publisher directory</a>, or return to the <a href="/" style="color: #4338ca; text-decoration: underline;">homepage</a> to discover more press release sources from Romania.
         </p>
       </div>
     </div>
@@ -262,50 +267,7 @@ def generate_publisher_page(site, all_sites):
   </div>
 </div>
 
-<footer style="margin-top: 64px; padding: 40px 0; border-top: 1px solid var(--border);">
-  <div style="max-width: 1200px; margin: 0 auto; padding: 0 32px;">
-    <div style="display: grid; grid-template-columns: repeat(auto-fit, minmax(250px, 1fr)); gap: 32px; margin-bottom: 32px;">
-      <div style="text-align: center;">
-        <h3 style="font-size: 16px; font-weight: 700; margin: 0 0 16px 0; color: var(--text);">Quick Links</h3>
-        <nav style="display: flex; flex-direction: column; gap: 10px; align-items: center;">
-          <a href="/" style="color: var(--muted); text-decoration: none; font-size: 14px; transition: color 0.2s;">Home</a>
-          <a href="/publishers/" style="color: var(--muted); text-decoration: none; font-size: 14px; transition: color 0.2s;">All Publishers</a>
-          <a href="/category/" style="color: var(--muted); text-decoration: none; font-size: 14px; transition: color 0.2s;">Categories</a>
-          <a href="/feed.xml" style="color: var(--muted); text-decoration: none; font-size: 14px; transition: color 0.2s;">RSS Feed</a>
-          <a href="/sitemap.xml" style="color: var(--muted); text-decoration: none; font-size: 14px; transition: color 0.2s;">Sitemap</a>
-        </nav>
-      </div>
-      <div style="text-align: center;">
-        <h3 style="font-size: 16px; font-weight: 700; margin: 0 0 16px 0; color: var(--text);">Categories</h3>
-        <nav style="display: flex; flex-direction: column; gap: 10px; align-items: center;">
-          <a href="/category/pr-marketing/" style="color: var(--muted); text-decoration: none; font-size: 14px; transition: color 0.2s;">PR & Marketing</a>
-          <a href="/category/health/" style="color: var(--muted); text-decoration: none; font-size: 14px; transition: color 0.2s;">Health</a>
-          <a href="/category/news-society/" style="color: var(--muted); text-decoration: none; font-size: 14px; transition: color 0.2s;">News & Society</a>
-          <a href="/category/technology-energy/" style="color: var(--muted); text-decoration: none; font-size: 14px; transition: color 0.2s;">Technology & Energy</a>
-          <a href="/category/business/" style="color: var(--muted); text-decoration: none; font-size: 14px; transition: color 0.2s;">Business</a>
-        </nav>
-      </div>
-      <div style="text-align: center;">
-        <h3 style="font-size: 16px; font-weight: 700; margin: 0 0 16px 0; color: var(--text);">More Categories</h3>
-        <nav style="display: flex; flex-direction: column; gap: 10px; align-items: center;">
-          <a href="/category/tourism-delta/" style="color: var(--muted); text-decoration: none; font-size: 14px; transition: color 0.2s;">Tourism & Delta</a>
-          <a href="/category/construction-home/" style="color: var(--muted); text-decoration: none; font-size: 14px; transition: color 0.2s;">Construction & Home</a>
-          <a href="/category/miscellaneous/" style="color: var(--muted); text-decoration: none; font-size: 14px; transition: color 0.2s;">Miscellaneous</a>
-        </nav>
-      </div>
-    </div>
-    <div style="padding-top: 32px; border-top: 1px solid var(--border); text-align: center;">
-      <p style="margin: 0 0 12px 0; color: var(--muted); font-size: 14px; line-height: 1.6;">
-        Listed content belongs to publishers. Release Press Releases in Romania hub displays only summaries from public RSS feeds with press releases. All press releases are sourced from publisher RSS feeds and are updated regularly. For complete articles and full content, please visit the original publisher websites linked on each publisher page.
-      </p>
-      <p style="margin: 0; color: var(--muted); font-size: 14px;">
-        © 2025 Release Press Releases in Romania. Central hub for press releases from Romania. 
-        <a href="/sitemap.xml" style="color: #4338ca; text-decoration: underline; font-weight: 500;">Sitemap</a> | 
-        <a href="/feed.xml" style="color: #4338ca; text-decoration: underline; font-weight: 500;">RSS Feed</a>
-      </p>
-    </div>
-  </div>
-</footer>
+{footer}
 </main>
 
 <script src="/assets/utils.js"></script>
@@ -316,36 +278,93 @@ def generate_publisher_page(site, all_sites):
     
     return html
 
-def main():
-    """Main function."""
+# Fields of a related publisher that its card on another page shows
+RELATED_FIELDS = ('slug', 'name', 'description_short_en', 'description_short', 'description_small_en', 'description_small')
+
+def page_hash(site, category_index, footer):
+    """Hash of everything a publisher page is rendered from."""
+    related = get_related_publishers(category_index, site, site.get('category', 'Miscellaneous'))
+    inputs = {
+        'template': TEMPLATE_VERSION,
+        'footer': footer,
+        'site': site,
+        'related': [{k: rel.get(k) for k in RELATED_FIELDS} for rel in related],
+    }
+    blob = json.dumps(inputs, ensure_ascii=False, sort_keys=True).encode('utf-8')
+    return hashlib.sha256(blob).hexdigest()[:32]
+
+def load_manifest():
+    try:
+        with open(MANIFEST_JSON, 'r', encoding='utf-8') as f:
+            return json.load(f).get('pages', {})
+    except (OSError, ValueError, AttributeError):
+        return {}
+
+def save_manifest(pages):
+    text = json.dumps({'pages': pages}, ensure_ascii=False, indent=1, sort_keys=True) + '\n'
+    write_if_changed(MANIFEST_JSON, text.encode('utf-8'))
+
+_worker_index = None
+_worker_footer = None
+
+def _init_worker(category_index, footer):
+    global _worker_index, _worker_footer
+    _worker_index = category_index
+    _worker_footer = footer
+
+def write_publisher_page(site, category_index=None, footer=None):
+    """Render one publisher page and write it to publisher/<slug>/index.html."""
+    page_dir = ROOT / 'publisher' / site['slug']
+    page_dir.mkdir(parents=True, exist_ok=True)
+    html = generate_publisher_page(site, category_index if category_index is not None else _worker_index,
+                                   footer if footer is not None else _worker_footer)
+    write_if_changed(page_dir / 'index.html', html.encode('utf-8'))
+    return site['slug']
+
+def main(argv=None, data=None):
+    """Main function. `data` is an already loaded SiteCatalog or sites.json (see build.py)."""
+    parser = argparse.ArgumentParser(description="Regenerate publisher pages from data/sites.json.")
+    parser.add_argument('--jobs', type=int, default=os.cpu_count() or 1, help='worker processes (1 renders in-process)')
+    parser.add_argument('--force', action='store_true', help='render every page, ignoring the build manifest')
+    args = parser.parse_args(argv)
+    
     print("Regenerating publisher pages with English text...\n")
     
-    # Load sites
-    with open(SITES_JSON, 'r', encoding='utf-8') as f:
-        data = json.load(f)
+    # Load sites (the pages render every field)
+    catalog = as_catalog(data, SITES_JSON)
+    print(f"Found {len(catalog)} sites\n")
+    
+    with_slug = catalog.sites
+    category_index = catalog.by_category
+    footer = FragmentCache().footer(ordered_categories(catalog, load_category_text()))
     
-    sites = data.get('sites', [])
-    print(f"Found {len(sites)} sites\n")
+    # Only render pages whose inputs changed since the last build
+    manifest = {} if args.force else load_manifest()
+    hashes = {s['slug']: page_hash(s, category_index, footer) for s in with_slug}
+    pages = [s for s in with_slug
+             if manifest.get(s['slug']) != hashes[s['slug']]
+             or not (ROOT / 'publisher' / s['slug'] / 'index.html').exists()]
+    removed = remove_stale_pages(ROOT / 'publisher', set(hashes))
+    print(f"{len(pages)} pages to render, {len(with_slug) - len(pages)} up to date, {len(removed)} removed\n")
     
     # Generate pages
     generated = 0
-    for site in sites:
-        slug = site.get('slug')
-        if not slug:
-            continue
-        
-        page_dir = ROOT / 'publisher' / slug
-        page_dir.mkdir(parents=True, exist_ok=True)
-        
-        html = generate_publisher_page(site, sites)
-        
-        page_file = page_dir / 'index.html'
-        with open(page_file, 'w', encoding='utf-8') as f:
-            f.write(html)
-        
-        generated += 1
-        if generated % 10 == 0:
-            print(f"  Generated {generated}/{len(sites)} pages...")
+    if args.jobs <= 1 or len(pages) < 2:
+        results = (write_publisher_page(site, category_index, footer) for site in pages)
+        pool = None
+    else:
+        # Each worker receives the index and footer once; tasks only carry their site
+        pool = ProcessPoolExecutor(max_workers=args.jobs, initializer=_init_worker, initargs=(category_index, footer))
+        results = pool.map(write_publisher_page, pages, chunksize=max(1, len(pages) // (args.jobs * 4)))
+    try:
+        for _ in results:
+            generated += 1
+            if generated % 10 == 0:
+                print(f"  Generated {generated}/{len(pages)} pages...")
+    finally:
+        if pool:
+            pool.shutdown()
+    save_manifest(hashes)
     
     print(f"\n✅ Generated {generated} publisher pages with English text")
     return 0
@@ -353,4 +372,3 @@ def main():
 if __name__ == '__main__':
     import sys
     sys.exit(main())
-
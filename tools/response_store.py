@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+Raw feed responses, stored so feeds can be reprocessed without the network.
+
+The fetchers record every response they get: status, the headers that
+matter, and the body bytes that were read. Bodies are gzip-compressed and
+content-addressed (blobs/<sha[:2]>/<sha256>.gz), so an unchanged feed costs
+one index row per fetch, not another copy. The index (index.sqlite3) is
+keyed by URL and fetch time.
+
+Bodies are what the streaming reader consumed (feed_parser.read_feed): the
+document up to the chunk holding the MAX_ITEMS-th entry, not always the
+whole feed. Replays therefore see as many entries as the recording run kept.
+
+Retention is size-bounded. After each run, prune() drops index rows beyond
+the newest KEEP_PER_URL per URL, then the oldest rows until the blobs fit in
+MAX_STORE_BYTES. The newest stored body of every URL is always kept, and
+unreferenced blobs are deleted.
+
+Replay: update_feeds.py --replay and generate_rss_feed.py --replay answer
+every request with open() (the newest stored body of the URL, or the newest
+at or before --replay-at), with no conditional requests and no delays, so
+reprocessing the corpus after a parser change is CPU-bound and repeatable.
+
+The store is not committed; the workflow keeps it in the Actions cache.
+
+Usage: python tools/response_store.py [--prune] [--max-mb N]
+"""
+from __future__ import annotations
+
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, Optional, Set
+
+from requests.structures import CaseInsensitiveDict
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+STORE_DIR = os.path.join(ROOT, "data", "responses")
+
+MAX_STORE_BYTES = 200 * 1024 * 1024   # compressed blobs
+KEEP_PER_URL = 24
+HEADERS_KEPT = ("Content-Type", "ETag", "Last-Modified", "Cache-Control", "Date", "Location")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    id         INTEGER PRIMARY KEY,
+    url        TEXT NOT NULL,          -- URL requested (feed candidate)
+    final_url  TEXT,                   -- after redirects, if different
+    fetched_at TEXT NOT NULL,          -- ISO 8601 UTC
+    status     INTEGER NOT NULL,
+    headers    TEXT NOT NULL,          -- JSON object of HEADERS_KEPT
+    digest     TEXT                    -- body sha256, NULL if no body (304, errors)
+);
+CREATE INDEX IF NOT EXISTS responses_url_time ON responses (url, fetched_at);
+CREATE TABLE IF NOT EXISTS blobs (
+    digest TEXT PRIMARY KEY,
+    size   INTEGER NOT NULL,           -- raw bytes
+    stored INTEGER NOT NULL            -- compressed bytes on disk
+);
+"""
+
+class NotStored(Exception):
+    """Replay found no stored body for a URL."""
+
+class StoredResponse:
+    """A recorded response, with the parts of requests.Response the fetchers use."""
+
+    def __init__(self, url: str, status: int, headers: Dict[str, str], body: bytes, fetched_at: str) -> None:
+        self.url = url
+        self.status_code = status
+        self.headers = CaseInsensitiveDict(headers)
+        self.content = body
+        self.fetched_at = fetched_at
+
+    def iter_content(self, chunk_size: int = 65536) -> Iterator[bytes]:
+        for i in range(0, len(self.content), chunk_size):
+            yield self.content[i:i + chunk_size]
+
+    def raise_for_status(self) -> None:
+        if self.status_code >= 400:
+            raise NotStored(f"stored response is HTTP {self.status_code}")
+
+    def __enter__(self) -> "StoredResponse":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        pass
+
+class ResponseStore:
+    """Thread-safe store of raw responses under `directory` (default STORE_DIR)."""
+
+    def __init__(self, directory: Optional[str] = None, max_bytes: int = MAX_STORE_BYTES,
+                 keep_per_url: int = KEEP_PER_URL) -> None:
+        directory = directory or STORE_DIR
+        self.dir = directory
+        self.max_bytes = max_bytes
+        self.keep_per_url = keep_per_url
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self.db = sqlite3.connect(os.path.join(directory, "index.sqlite3"), check_same_thread=False)
+        self.db.executescript(SCHEMA)
+
+    def close(self) -> None:
+        self.db.close()
+
+    def __enter__(self) -> "ResponseStore":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    def _blob_path(self, digest: str) -> str:
+        return os.path.join(self.dir, "blobs", digest[:2], digest + ".gz")
+
+    def put(self, url: str, response: Any, body: Optional[bytes] = None, fetched_at: Optional[str] = None) -> None:
+        """Record `response` (requests or StoredResponse) for `url`; `body` is the bytes read."""
+        fetched_at = fetched_at or datetime.now(timezone.utc).isoformat()
+        headers = {k: response.headers[k] for k in HEADERS_KEPT if response.headers.get(k)}
+        final_url = response.url if response.url and response.url != url else None
+        digest = hashlib.sha256(body).hexdigest() if body else None
+        with self._lock:
+            if digest and not self.db.execute("SELECT 1 FROM blobs WHERE digest = ?", (digest,)).fetchone():
+                path = self._blob_path(digest)
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                packed = gzip.compress(body, mtime=0)
+                with open(path + ".tmp", "wb") as f:
+                    f.write(packed)
+                os.replace(path + ".tmp", path)
+                self.db.execute("INSERT INTO blobs (digest, size, stored) VALUES (?, ?, ?)",
+                                (digest, len(body), len(packed)))
+            self.db.execute("INSERT INTO responses (url, final_url, fetched_at, status, headers, digest) "
+                            "VALUES (?, ?, ?, ?, ?, ?)",
+                            (url, final_url, fetched_at, response.status_code, json.dumps(headers), digest))
+            self.db.commit()
+
+    def open(self, url: str, at: Optional[str] = None) -> StoredResponse:
+        """The newest stored body of `url` (at or before `at`); raises NotStored."""
+        sql = "SELECT final_url, fetched_at, status, headers, digest FROM responses WHERE url = ? AND digest IS NOT NULL"
+        args: list = [url]
+        if at:
+            sql += " AND fetched_at <= ?"
+            args.append(at)
+        with self._lock:
+            row = self.db.execute(sql + " ORDER BY fetched_at DESC LIMIT 1", args).fetchone()
+        if row is None:
+            raise NotStored(f"no stored response for {url}")
+        final_url, fetched_at, status, headers, digest = row
+        with open(self._blob_path(digest), "rb") as f:
+            body = gzip.decompress(f.read())
+        return StoredResponse(final_url or url, status, json.loads(headers), body, fetched_at)
+
+    def urls(self) -> Set[str]:
+        """URLs with at least one stored body."""
+        with self._lock:
+            return {u for (u,) in self.db.execute("SELECT DISTINCT url FROM responses WHERE digest IS NOT NULL")}
+
+    def prune(self) -> int:
+        """Apply the retention limits; returns the number of blobs deleted."""
+        with self._lock:
+            db = self.db
+            newest = "SELECT MAX(id) FROM responses WHERE digest IS NOT NULL GROUP BY url"
+            # Rows beyond the newest keep_per_url of their URL, sparing each URL's newest body
+            db.execute(f"""DELETE FROM responses WHERE id NOT IN ({newest}) AND id IN (
+                SELECT id FROM (SELECT id, ROW_NUMBER() OVER (PARTITION BY url ORDER BY fetched_at DESC) AS n
+                                FROM responses) WHERE n > ?)""", (self.keep_per_url,))
+            # Then the oldest rows until the blobs fit
+            total = db.execute("SELECT COALESCE(SUM(stored), 0) FROM blobs").fetchone()[0]
+            if total > self.max_bytes:
+                candidates = db.execute(f"SELECT id, digest FROM responses WHERE id NOT IN ({newest}) "
+                                        f"ORDER BY fetched_at").fetchall()
+                refs = dict(db.execute("SELECT digest, COUNT(*) FROM responses WHERE digest IS NOT NULL "
+                                       "GROUP BY digest").fetchall())
+                sizes = dict(db.execute("SELECT digest, stored FROM blobs").fetchall())
+                doomed = []
+                for row_id, digest in candidates:
+                    if total <= self.max_bytes:
+                        break
+                    doomed.append((row_id,))
+                    if digest:
+                        refs[digest] -= 1
+                        if refs[digest] == 0:
+                            total -= sizes.get(digest, 0)
+                db.executemany("DELETE FROM responses WHERE id = ?", doomed)
+            orphans = [d for (d,) in db.execute(
+                "SELECT digest FROM blobs WHERE digest NOT IN (SELECT digest FROM responses WHERE digest IS NOT NULL)")]
+            db.executemany("DELETE FROM blobs WHERE digest = ?", [(d,) for d in orphans])
+            db.commit()
+        for digest in orphans:
+            try:
+                os.remove(self._blob_path(digest))
+            except OSError:
+                pass
+        return len(orphans)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            responses, urls = self.db.execute("SELECT COUNT(*), COUNT(DISTINCT url) FROM responses").fetchone()
+            blobs, size, stored = self.db.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0), COALESCE(SUM(stored), 0) FROM blobs").fetchone()
+        return {"responses": responses, "urls": urls, "blobs": blobs, "bytes": size, "stored_bytes": stored}
+
+def main(argv: Optional[list] = None) -> int:
+    ap = argparse.ArgumentParser(description="Raw feed response store.")
+    ap.add_argument("--prune", action="store_true", help="apply the retention limits now")
+    ap.add_argument("--max-mb", type=float, default=MAX_STORE_BYTES / 1024 / 1024)
+    args = ap.parse_args(argv)
+    with ResponseStore(max_bytes=int(args.max_mb * 1024 * 1024)) as store:
+        if args.prune:
+            print(f"Deleted {store.prune()} blobs")
+        s = store.stats()
+        print(f"{s['responses']} responses for {s['urls']} URLs; {s['blobs']} bodies, "
+              f"{s['bytes'] / 1024 / 1024:.1f} MiB raw, {s['stored_bytes'] / 1024 / 1024:.1f} MiB stored")
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
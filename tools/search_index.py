@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+"""
+Build the static full-text search index over the cached press releases.
+
+Titles and summaries from data/feeds/<slug>.json are tokenized (lower-cased,
+Romanian diacritics folded: ă/â -> a, î -> i, ș/ş -> s, ț/ţ -> t, plus any
+other combining mark), and written to data/search/ as an inverted index
+sharded by the first PREFIX_LEN characters of each term:
+
+    index.json          version, tokenizer settings, shard and doc counts
+    terms/<prefix>.json {term: [doc id deltas]} for terms starting with prefix
+    docs/<n>.json       {doc id: [title, link, slug, published]} for ids
+                        n*DOC_BUCKET .. (n+1)*DOC_BUCKET-1
+
+so the browser (assets/search.js) only downloads the term shards of the
+query words and the doc buckets of the hits it shows. Buckets are small
+(DOC_BUCKET docs, a few KiB) and a changed feed gets new, higher ids, so
+the newest hits of a query sit in a handful of buckets.
+
+Updates are incremental: data/search/state.json remembers, per slug, a hash
+of its items, its doc ids and the shards it contributed to. Only changed or
+removed slugs are re-tokenized, and only the shards and doc buckets they
+touch are read and rewritten. --full rebuilds from scratch.
+"""
+from __future__ import annotations
+
+import argparse
+import glob
+import hashlib
+import json
+import os
+import re
+import shutil
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+from feed_writer import write_json
+from normalize import fold
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+FEEDS_DIR = os.path.join(ROOT, "data", "feeds")
+SEARCH_DIR = os.path.join(ROOT, "data", "search")
+
+INDEX_VERSION = 1
+PREFIX_LEN = 2
+DOC_BUCKET = 32
+MIN_TERM = 2
+MAX_TERM = 32
+
+STOPWORDS = frozenset("""
+a ai al ale am ar are as au ca cand care cat ce cea cel cele cei cu da daca dar de din
+dintr dintre doar du e ea ei el este eu fi fie fost iar il in insa intr intre isi la le
+li lor lui mai mult ne nici nu o ori pe pentru prin sa sau se si sub sunt ta te tot toti
+un una unei unor unui va vor
+an and are as at be by for from has in is it its of on or that the this to was were with
+""".split())
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+def tokenize(text: str) -> List[str]:
+    return [t for t in _TOKEN.findall(fold(text or ""))
+            if MIN_TERM <= len(t) <= MAX_TERM and t not in STOPWORDS]
+
+def shard_of(term: str) -> str:
+    return term[:PREFIX_LEN]
+
+def bucket_of(doc_id: int) -> int:
+    return doc_id // DOC_BUCKET
+
+def encode(ids: Iterable[int]) -> List[int]:
+    """Sorted ids as deltas (first id, then gaps): small numbers, short JSON."""
+    out, prev = [], 0
+    for i in sorted(ids):
+        out.append(i - prev)
+        prev = i
+    return out
+
+def decode(deltas: List[int]) -> List[int]:
+    out, total = [], 0
+    for d in deltas:
+        total += d
+        out.append(total)
+    return out
+
+def _read(path: str) -> Dict[str, Any]:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def _items_hash(items: List[Dict[str, Any]]) -> str:
+    return hashlib.sha256(json.dumps(items, ensure_ascii=False, sort_keys=True).encode("utf-8")).hexdigest()[:32]
+
+class SearchIndex:
+    """Incrementally maintained sharded index in `directory`."""
+
+    def __init__(self, directory: str = SEARCH_DIR) -> None:
+        self.dir = directory
+        self.state_path = os.path.join(directory, "state.json")
+        state = _read(self.state_path)
+        if (state.get("version") != INDEX_VERSION or state.get("prefix_len") != PREFIX_LEN
+                or state.get("doc_bucket") != DOC_BUCKET):
+            # Unknown layout: start over rather than merge into foreign shards
+            state = {}
+            for sub in ("terms", "docs"):
+                shutil.rmtree(os.path.join(directory, sub), ignore_errors=True)
+        self.slugs: Dict[str, Dict[str, Any]] = state.get("slugs", {})
+        self.next_id: int = state.get("next_id", 0)
+        self.doc_count: int = state.get("docs", 0)
+
+    def _path(self, kind: str, name: Any) -> str:
+        return os.path.join(self.dir, kind, f"{name}.json")
+
+    def update(self, feeds: Dict[str, List[Dict[str, Any]]]) -> Dict[str, int]:
+        """Bring the index in line with `feeds` ({slug: items}); returns counters."""
+        removed_ids: Set[int] = set()
+        touched_shards: Set[str] = set()
+        touched_buckets: Set[int] = set()
+        new_postings: Dict[str, Dict[str, Set[int]]] = {}
+        new_docs: Dict[int, List[Any]] = {}
+        changed = 0
+
+        for slug in sorted(set(self.slugs) | set(feeds)):
+            items = feeds.get(slug)
+            digest = _items_hash(items) if items is not None else None
+            old = self.slugs.get(slug)
+            if old and old["hash"] == digest:
+                continue
+            changed += 1
+            if old:
+                removed_ids.update(old["docs"])
+                touched_shards.update(old["shards"])
+                touched_buckets.update(bucket_of(i) for i in old["docs"])
+                self.doc_count -= len(old["docs"])
+                del self.slugs[slug]
+            if items is None:
+                continue
+            doc_ids, shards = [], set()
+            for item in items:
+                terms = set(tokenize(item.get("title", "")) + tokenize(item.get("summary", "")))
+                if not terms or not item.get("link"):
+                    continue
+                doc_id = self.next_id
+                self.next_id += 1
+                doc_ids.append(doc_id)
+                new_docs[doc_id] = [item.get("title", ""), item["link"], slug, item.get("published")]
+                for term in terms:
+                    new_postings.setdefault(shard_of(term), {}).setdefault(term, set()).add(doc_id)
+                    shards.add(shard_of(term))
+            touched_shards.update(shards)
+            touched_buckets.update(bucket_of(i) for i in doc_ids)
+            self.doc_count += len(doc_ids)
+            self.slugs[slug] = {"hash": digest, "docs": doc_ids, "shards": sorted(shards)}
+
+        for shard in touched_shards:
+            self._merge_shard(shard, removed_ids, new_postings.get(shard, {}))
+        for bucket in touched_buckets:
+            self._merge_bucket(bucket, removed_ids, new_docs)
+        self._save()
+        return {"changed": changed, "shards": len(touched_shards), "buckets": len(touched_buckets)}
+
+    def _merge_shard(self, shard: str, removed: Set[int], added: Dict[str, Set[int]]) -> None:
+        path = self._path("terms", shard)
+        postings = {term: set(decode(d)) - removed for term, d in _read(path).items()}
+        for term, ids in added.items():
+            postings.setdefault(term, set()).update(ids)
+        postings = {term: encode(ids) for term, ids in sorted(postings.items()) if ids}
+        self._write_or_remove(path, postings)
+
+    def _merge_bucket(self, bucket: int, removed: Set[int], added: Dict[int, List[Any]]) -> None:
+        path = self._path("docs", bucket)
+        docs = {int(k): v for k, v in _read(path).items() if int(k) not in removed}
+        docs.update({i: d for i, d in added.items() if bucket_of(i) == bucket})
+        self._write_or_remove(path, {str(i): docs[i] for i in sorted(docs)})
+
+    def _write_or_remove(self, path: str, obj: Dict[str, Any]) -> None:
+        if obj:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            write_json(path, obj)
+        elif os.path.exists(path):
+            os.remove(path)
+
+    def _save(self) -> None:
+        shards = sorted(os.path.basename(p)[:-5] for p in glob.glob(self._path("terms", "*")))
+        write_json(os.path.join(self.dir, "index.json"), {
+            "version": INDEX_VERSION,
+            "prefix_len": PREFIX_LEN,
+            "min_term": MIN_TERM,
+            "doc_bucket": DOC_BUCKET,
+            "docs": self.doc_count,
+            "shards": shards,
+            "stopwords": sorted(STOPWORDS),
+        })
+        write_json(self.state_path, {
+            "version": INDEX_VERSION,
+            "prefix_len": PREFIX_LEN,
+            "doc_bucket": DOC_BUCKET,
+            "next_id": self.next_id,
+            "docs": self.doc_count,
+            "slugs": self.slugs,
+        })
+
+def load_feeds(feeds_dir: str = FEEDS_DIR) -> Dict[str, List[Dict[str, Any]]]:
+    """{slug: items} for every cached feed."""
+    feeds = {}
+    for path in glob.glob(os.path.join(feeds_dir, "*.json")):
+        payload = _read(path)
+        feeds[os.path.basename(path)[:-len(".json")]] = payload.get("items") or []
+    return feeds
+
+def build(directory: str = SEARCH_DIR, feeds_dir: str = FEEDS_DIR, full: bool = False) -> Dict[str, int]:
+    if full and os.path.isdir(directory):
+        shutil.rmtree(directory)
+    return SearchIndex(directory).update(load_feeds(feeds_dir))
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description="Build the sharded search index in data/search.")
+    ap.add_argument("--full", action="store_true", help="rebuild from scratch instead of updating")
+    args = ap.parse_args(argv)
+    stats = build(full=args.full)
+    print(f"Search index: {stats['changed']} feeds changed, "
+          f"{stats['shards']} term shards and {stats['buckets']} doc buckets rewritten")
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
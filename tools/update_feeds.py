@@ -5,63 +5,161 @@ Update cached feed JSON for GitHub Pages.
 - Reads data/sites.json
 - Fetches RSS for each site (tries /feed/ then fallback to ?feed=rss2)
 - Optionally fetches Mastodon RSS if present
-- Writes data/feeds/<slug>.json
+- Writes data/feeds/<slug>.json and the data/latest/ bundles
+
+Sites are fetched concurrently through one pooled session, at most
+MAX_WORKERS at a time and PER_HOST_LIMIT requests per host. Only the sites
+that are due are polled (poll_interval, feed_state.py; --force polls all),
+most overdue first, and with --time-budget no site is started once the
+budget is spent. Requests are conditional, and a slug file is only
+rewritten when its content hash (kept in data/feeds-manifest.json) changes.
+
+Changed items also go to the SQLite archive (archive.py), which tops up the
+category bundles with items gone from the feeds' windows; every request is
+recorded in the fetch metrics (fetch_metrics.py) and raw responses in
+data/responses/ (response_store.py). --replay reprocesses the stored
+responses without touching the network. JSON is written minified, in
+format FEED_FORMAT_VERSION (--pretty indents it).
 """
 from __future__ import annotations
 
+import argparse
+import glob
+import heapq
 import json
 import os
-import re
+import threading
 import time
-from datetime import datetime, timezone
-from typing import Any, Dict, List, Optional
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Union
 import requests
-import feedparser
+
+from archive import ARCHIVE_DB, Archive, normalize_link
+from catalog import DEFAULT_CATEGORY, LIGHT_FIELDS, SiteCatalog, as_catalog, category_slug, site_host
+from dedup import dedupe
+from feed_parser import parse_items, read_feed
+from feed_state import FeedState, body_hash, load_state
+from feed_writer import write_if_changed, write_json
+from fetch_metrics import FetchMetrics, FetchRecord, TimedAdapter
+from normalize import Item, parse_date
+from response_store import STORE_DIR, ResponseStore
 
 ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
 SITES_JSON = os.path.join(ROOT, "data", "sites.json")
 OUT_DIR = os.path.join(ROOT, "data", "feeds")
+STATE_JSON = os.path.join(ROOT, "data", "feed_state.json")
+MANIFEST_JSON = os.path.join(ROOT, "data", "feeds-manifest.json")
+LATEST_DIR = os.path.join(ROOT, "data", "latest")
+
+FEED_FORMAT_VERSION = 2
+PRETTY_JSON = False   # set by --pretty
+REPLAY = False        # set by --replay: answer requests from _store
+REPLAY_AT: Optional[str] = None
 
 UA = "ReleasePressRomaniaBot/1.0 (+https://release-press-releases-romania.github.io/)"
 TIMEOUT = 20
+CONNECT_TIMEOUT = 5
+MAX_WORKERS = 16      # sites fetched in parallel
+PER_HOST_LIMIT = 2    # concurrent requests to any single host
+MAX_ITEMS = 12        # entries kept per feed
+LATEST_ITEMS = 30     # items in data/latest/all.json
+LATEST_PER_CATEGORY = 20
+LATEST_SOCIAL = 20
 
-def strip_html(s: str) -> str:
-    s = s or ""
-    s = re.sub(r"<(script|style)\b.*?>.*?</\1>", " ", s, flags=re.S|re.I)
-    s = re.sub(r"<[^>]+>", " ", s)
-    s = re.sub(r"\s+", " ", s).strip()
-    return s
-
-def parse_date(entry: Dict[str, Any]) -> Optional[str]:
-    # feedparser returns various date formats; try common fields
-    for k in ("published", "updated"):
-        if entry.get(k):
-            return entry[k]
-    return None
-
-def to_iso(dt_str: Optional[str]) -> Optional[str]:
-    if not dt_str:
-        return None
-    # feedparser doesn't always give parseable; keep as is
-    return dt_str
+# Polling schedule bounds; the workflow runs hourly, so MIN_POLL is 1 run
+MIN_POLL = timedelta(hours=1)
+MAX_POLL = timedelta(hours=24)
+DEFAULT_POLL = timedelta(hours=6)       # too few dated items to infer a cadence
+SCHEDULE_SLACK = timedelta(minutes=10)  # absorb cron start-time jitter
 
-def human_date(dt_str: Optional[str]) -> str:
-    if not dt_str:
-        return ""
-    # best-effort, keep short
-    try:
-        # if RFC822 etc, feedparser stores parsed tuple in published_parsed
-        return dt_str[:16].strip()
-    except Exception:
-        return dt_str
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+_host_slots: Dict[str, threading.BoundedSemaphore] = {}
+_host_slots_lock = threading.Lock()
+_store: Optional[ResponseStore] = None
+
+# Returned by fetch_feed when the server (or the body hash) says nothing changed.
+NOT_MODIFIED = object()
+# Returned by update_site when the time budget ran out before it started.
+SKIPPED = object()
+
+def get_session() -> requests.Session:
+    """Shared keep-alive session, sized for MAX_WORKERS parallel fetches."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            s = requests.Session()
+            adapter = TimedAdapter(pool_connections=128, pool_maxsize=max(PER_HOST_LIMIT, MAX_WORKERS))
+            s.mount("http://", adapter)
+            s.mount("https://", adapter)
+            s.headers.update({"User-Agent": UA, "Accept": "application/rss+xml, application/xml;q=0.9, */*;q=0.8"})
+            _session = s
+        return _session
+
+def add_host_slots(catalog: SiteCatalog) -> None:
+    """Create the semaphores of every host in `catalog` up front."""
+    with _host_slots_lock:
+        for host in catalog.by_host:
+            _host_slots.setdefault(host, threading.BoundedSemaphore(PER_HOST_LIMIT))
+
+def host_slot(url: str) -> threading.BoundedSemaphore:
+    """Semaphore limiting concurrent requests to the host of `url`."""
+    host = site_host(url)
+    slot = _host_slots.get(host)
+    if slot is None:
+        with _host_slots_lock:
+            slot = _host_slots.setdefault(host, threading.BoundedSemaphore(PER_HOST_LIMIT))
+    return slot
+
+def _get(url: str, headers: Dict[str, str]) -> Any:
+    """GET `url`, or its stored response when replaying."""
+    if REPLAY:
+        return _store.open(url, REPLAY_AT)
+    return get_session().get(url, headers=headers, timeout=(CONNECT_TIMEOUT, TIMEOUT), stream=True)
+
+def _record(url: str, response: Any, body: Optional[bytes] = None) -> None:
+    if _store is not None and not REPLAY:
+        _store.put(url, response, body)
 
-def fetch_feed(url: str) -> Optional[feedparser.FeedParserDict]:
+def fetch_feed(url: str, source: str, state: Optional[FeedState] = None, conditional: bool = True,
+               metrics: Optional[FetchMetrics] = None, slug: str = "", kind: str = "site") -> Any:
+    """Fetch `url` and return its first MAX_ITEMS items (see entry_to_item).
+
+    Returns None on failure, or NOT_MODIFIED when `state` is given and the
+    feed hasn't changed since it was last processed. With conditional=False
+    the validators are only recorded, never used. The request is recorded
+    in `metrics` when given, as `slug`'s `kind` ("site" or "social") feed.
+    """
+    rec = metrics.record(slug, url, kind) if metrics else FetchRecord(slug, url, kind)
     try:
-        r = requests.get(url, headers={"User-Agent": UA, "Accept": "application/rss+xml, application/xml;q=0.9, */*;q=0.8"}, timeout=TIMEOUT)
-        if r.status_code >= 400:
-            return None
-        return feedparser.parse(r.content)
-    except Exception:
+        headers = state.request_headers(url) if state and conditional else {}
+        with host_slot(url):
+            rec.acquired()
+            with _get(url, headers) as r:
+                rec.response(r.status_code, r.url)
+                if r.status_code == 304 or r.status_code >= 400:
+                    _record(url, r)
+                if state and r.status_code == 304:
+                    rec.done("not_modified")
+                    return NOT_MODIFIED
+                if r.status_code >= 400:
+                    rec.done("http_error", f"HTTP {r.status_code}")
+                    return None
+                raw: List[bytes] = []
+                stream, body = read_feed(r, MAX_ITEMS, raw)
+                _record(url, r, b"".join(raw))
+                rec.body(sum(len(c) for c in raw))
+        if state and conditional and state.is_unchanged(url, body):
+            rec.done("unchanged")
+            return NOT_MODIFIED
+        items = parse_items(stream, body, source, MAX_ITEMS)
+        rec.done("ok" if items else "empty", "" if items else "no items parsed", len(items))
+        if state and items:
+            state.remember(url, r, content=body)
+        return items
+    except Exception as e:
+        rec.fail(e)
         return None
 
 def best_site_feed(site_url: str, primary: str) -> List[str]:
@@ -74,96 +172,286 @@ def best_site_feed(site_url: str, primary: str) -> List[str]:
         base + "/feed/atom/",
     ]
 
-def entry_to_item(e: Dict[str, Any], source: str) -> Dict[str, Any]:
-    title = strip_html(e.get("title", "")).strip() or "Update"
-    link = e.get("link") or ""
-    summary = strip_html(e.get("summary") or e.get("description") or "")
-    dt = None
-    if e.get("published_parsed"):
-        try:
-            dt = datetime(*e["published_parsed"][:6], tzinfo=timezone.utc).isoformat()
-        except Exception:
-            dt = None
-    if not dt and e.get("updated_parsed"):
-        try:
-            dt = datetime(*e["updated_parsed"][:6], tzinfo=timezone.utc).isoformat()
-        except Exception:
-            dt = None
-    if not dt:
-        dt = to_iso(parse_date(e))
-
-    return {
-        "title": title[:180],
-        "link": link,
-        "summary": summary[:800],
-        "published": dt,
-        "published_human": human_date(dt or ""),
-        "source": source,
-    }
+def poll_interval(items: List[Item], unchanged: int = 0, now: Optional[datetime] = None) -> timedelta:
+    """How long to wait before polling a site again.
 
-def main() -> int:
-    os.makedirs(OUT_DIR, exist_ok=True)
+    Half the median gap between recent items, but at least a quarter of the
+    time since the newest one (quiet sites slow down), doubled for every
+    consecutive unchanged poll up to 4x, clamped to [MIN_POLL, MAX_POLL].
+    """
+    now = now or datetime.now(timezone.utc)
+    stamps = sorted((i.published for i in items if i.published), reverse=True)
+    if len(stamps) < 2:
+        interval = DEFAULT_POLL
+    else:
+        gaps = sorted(a - b for a, b in zip(stamps, stamps[1:]))
+        interval = max(gaps[len(gaps) // 2] / 2, (now - stamps[0]) / 4)
+    interval *= 2 ** min(unchanged, 2)
+    return max(MIN_POLL, min(MAX_POLL, interval))
 
-    with open(SITES_JSON, "r", encoding="utf-8") as f:
-        data = json.load(f)
+def load_previous(slug: str) -> Optional[Dict[str, Any]]:
+    try:
+        with open(os.path.join(OUT_DIR, f"{slug}.json"), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
 
-    sites = data.get("sites", [])
-    now = datetime.now(timezone.utc).isoformat()
+def content_hash(payload: Dict[str, Any]) -> str:
+    """Hash of a feed payload, ignoring the volatile `updated_at`."""
+    content = {k: v for k, v in payload.items() if k != "updated_at"}
+    return body_hash(json.dumps(content, ensure_ascii=False, sort_keys=True).encode("utf-8"))
 
-    ok = 0
-    for s in sites:
-        slug = s.get("slug")
-        site_name = s.get("name")
-        site_url = s.get("url")
-        rss = s.get("rss")
-        cat = s.get("category")
-        mastodon = s.get("mastodon")
-        mastodon_rss = s.get("mastodon_rss")
-
-        items: List[Dict[str, Any]] = []
-        social: List[Dict[str, Any]] = []
-
-        # Site feed
-        feed_obj = None
-        for candidate in best_site_feed(site_url, rss):
-            feed_obj = fetch_feed(candidate)
-            if feed_obj and getattr(feed_obj, "entries", None):
-                rss = candidate
-                break
-
-        if feed_obj and feed_obj.entries:
-            for e in feed_obj.entries[:12]:
-                items.append(entry_to_item(e, source=site_url))
-        else:
-            # keep empty; allow later reruns
-            items = []
-
-        # Mastodon feed (optional)
-        if mastodon and mastodon_rss:
-            md = fetch_feed(mastodon_rss)
-            if md and md.entries:
-                for e in md.entries[:12]:
-                    social.append(entry_to_item(e, source="Mastodon"))
+def load_manifest() -> Dict[str, Dict[str, Any]]:
+    try:
+        with open(MANIFEST_JSON, "r", encoding="utf-8") as f:
+            return json.load(f).get("feeds", {})
+    except (OSError, ValueError, AttributeError):
+        return {}
+
+def save_manifest(feeds: Dict[str, Dict[str, Any]]) -> None:
+    text = json.dumps({"feeds": feeds}, ensure_ascii=False, indent=1, sort_keys=True) + "\n"
+    write_if_changed(MANIFEST_JSON, text.encode("utf-8"))
+
+def update_site(s: Dict[str, Any], now: str, state: Optional[FeedState] = None,
+                known_hash: Optional[str] = None, metrics: Optional[FetchMetrics] = None,
+                deadline: Optional[float] = None) -> Any:
+    """Fetch one site (and its Mastodon feed) and write data/feeds/<slug>.json.
 
+    The file is only written when its content hash differs from `known_hash`.
+    Returns the content hash, None when every feed was unchanged upstream, or
+    SKIPPED without fetching once `deadline` (time.monotonic()) has passed.
+    """
+    if deadline is not None and time.monotonic() >= deadline:
+        return SKIPPED
+    slug = s.get("slug")
+    site_url = s.get("url")
+    rss = s.get("rss")
+    mastodon = s.get("mastodon")
+    mastodon_rss = s.get("mastodon_rss")
+
+    items: List[Item] = []
+    social: List[Item] = []
+
+    # Conditional requests only make sense if we still have what they'd reuse
+    previous = load_previous(slug) if state else None
+    cond = previous is not None
+
+    # Site feed
+    candidates = best_site_feed(site_url, rss)
+    if state:
+        candidates = state.order_candidates(slug, candidates)
+    feed_items = None
+    for candidate in candidates:
+        feed_items = fetch_feed(candidate, site_url, state, cond, metrics, slug)
+        if feed_items:
+            if state:
+                state.record_success(slug, candidate)
+            break
+        if state:
+            state.record_failure(slug, candidate)
+
+    # Every candidate is backed off: nothing new to say about this site
+    if not candidates and previous:
+        feed_items = NOT_MODIFIED
+
+    site_unchanged = feed_items is NOT_MODIFIED
+    if site_unchanged:
+        items = [Item.from_dict(d) for d in previous.get("items", [])]
+    elif feed_items:
+        items = feed_items
+    else:
+        # keep empty; allow later reruns
+        items = []
+
+    # Mastodon feed (optional)
+    social_unchanged = True
+    if mastodon and mastodon_rss:
+        md = fetch_feed(mastodon_rss, "Mastodon", state, cond, metrics, slug, "social")
+        social_unchanged = md is NOT_MODIFIED
+        if social_unchanged:
+            social = [Item.from_dict(d) for d in previous.get("social", [])]
+        elif md:
+            social = md
+
+    digest = None
+    if not (site_unchanged and social_unchanged):
+        source = next((i.source for i in items if i.source), None) or (previous or {}).get("source")
         payload = {
+            "version": FEED_FORMAT_VERSION,
             "slug": slug,
-            "site": {"name": site_name, "url": site_url, "category": cat, "rss": rss},
-            "mastodon": {"url": mastodon, "rss": mastodon_rss} if mastodon else None,
             "updated_at": now,
             "status": "ok" if items or social else "empty",
-            "items": items,
-            "social": social,
+            "source": source,
+            "items": [i.to_dict(compact=True) for i in items],
+            "social": [i.to_dict(compact=True) for i in social],
         }
+        digest = content_hash(payload)
+        if digest != known_hash:
+            write_json(os.path.join(OUT_DIR, f"{slug}.json"), payload, pretty=PRETTY_JSON)
+
+    if state:
+        changed = digest is not None and digest != known_hash
+        streak = 0 if changed else state.unchanged_streak(slug) + 1
+        state.schedule(slug, poll_interval(items + social, streak), streak)
+    return digest
+
+def _newest(entries: List[Dict[str, Any]], n: int) -> List[Dict[str, Any]]:
+    """The `n` newest entries; undated ones only fill remaining places."""
+    oldest = datetime.min.replace(tzinfo=timezone.utc)
+    return heapq.nlargest(n, entries, key=lambda e: parse_date(e.get("published")) or oldest)
 
-        out = os.path.join(OUT_DIR, f"{slug}.json")
-        with open(out, "w", encoding="utf-8") as f:
-            json.dump(payload, f, ensure_ascii=False, indent=2)
+def _merge_syndicated(items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """One entry per near-duplicate cluster, the other copies as `alternates`."""
+    out = []
+    for item, alternates in dedupe(items, lambda i: f"{i.get('title')} {i.get('summary')}",
+                                   lambda i: parse_date(i.get("published")), lambda i: i["site_slug"]):
+        if alternates:
+            item = dict(item, alternates=[{k: a[k] for k in ("link", "site_slug", "site_name")}
+                                          for a in alternates])
+        out.append(item)
+    return out
+
+def write_latest(sites: List[Dict[str, Any]], archive: Optional[Archive] = None) -> int:
+    """Write the data/latest/ bundles from the feed cache; returns how many changed.
+
+    With `archive`, a category bundle also lists the newest archived items
+    its publishers' current feeds no longer carry.
+    """
+    items: List[Dict[str, Any]] = []
+    social: List[Dict[str, Any]] = []
+    by_slug: Dict[str, Dict[str, Any]] = {}
+    for s in sites:
+        site = {"site_slug": s.get("slug"), "site_name": s.get("name"), "site_url": s.get("url"),
+                "category": s.get("category") or DEFAULT_CATEGORY}
+        by_slug[site["site_slug"]] = site
+        payload = load_previous(s.get("slug"))
+        if not payload:
+            continue
+        items += [dict(i, **site) for i in payload.get("items") or []]
+        if s.get("mastodon"):
+            social += [dict(i, mastodon=s["mastodon"], **site) for i in payload.get("social") or []]
 
-        ok += 1
-        # be polite
-        time.sleep(0.15)
+    by_cat: Dict[str, List[Dict[str, Any]]] = {}
+    for i in items:
+        by_cat.setdefault(category_slug(i["category"]), []).append(i)
+    if archive:
+        cached = {normalize_link(i["link"]) for i in items if i.get("link")}
+        for category in {site["category"] for site in by_slug.values()}:
+            for row in archive.latest(category=category, limit=LATEST_PER_CATEGORY):
+                site = by_slug.get(row.pop("slug"))
+                if site and normalize_link(row["link"]) not in cached:
+                    entry = {k: v for k, v in row.items() if v is not None and k != "category"}
+                    by_cat.setdefault(category_slug(category), []).append(dict(entry, **site))
+    bundles = {
+        os.path.join(LATEST_DIR, "all.json"): _newest(_merge_syndicated(items), LATEST_ITEMS),
+        os.path.join(LATEST_DIR, "mastodon.json"): _newest(social, LATEST_SOCIAL),
+    }
+    for cat, entries in by_cat.items():
+        # Merged per category, so a copy stays listed where its canonical is not
+        bundles[os.path.join(LATEST_DIR, "category", f"{cat}.json")] = _newest(_merge_syndicated(entries),
+                                                                               LATEST_PER_CATEGORY)
+
+    changed = sum(write_json(path, {"version": FEED_FORMAT_VERSION, "items": entries}, pretty=PRETTY_JSON)
+                  for path, entries in bundles.items())
+    for path in glob.glob(os.path.join(LATEST_DIR, "category", "*.json")):
+        if path not in bundles:
+            os.remove(path)
+            changed += 1
+    return changed
+
+def main(argv: Optional[List[str]] = None, data: Union[SiteCatalog, Dict[str, Any], None] = None) -> int:
+    """Run the update; `data` is an already loaded SiteCatalog or sites.json (see build.py)."""
+    ap = argparse.ArgumentParser(description="Update cached feed JSON for GitHub Pages.")
+    ap.add_argument("--force", action="store_true", help="poll every site, not just the ones that are due")
+    ap.add_argument("--pretty", action="store_true", help="write indented JSON (for debugging)")
+    ap.add_argument("--time-budget", type=float, metavar="SECONDS", help="start no site after this many seconds")
+    ap.add_argument("--archive", default=ARCHIVE_DB, help="SQLite item archive ('' to disable)")
+    ap.add_argument("--store", default=STORE_DIR, help="raw response store directory")
+    ap.add_argument("--no-record", action="store_true", help="don't record raw responses")
+    ap.add_argument("--replay", action="store_true", help="reprocess every site from the stored responses")
+    ap.add_argument("--replay-at", metavar="ISO", help="replay the responses stored at or before this time")
+    args = ap.parse_args(argv)
+    deadline = time.monotonic() + args.time_budget if args.time_budget else None
+    global PRETTY_JSON, REPLAY, REPLAY_AT, _store
+    PRETTY_JSON = args.pretty
+    REPLAY = args.replay or bool(args.replay_at)
+    REPLAY_AT = args.replay_at
+    _store = ResponseStore(args.store) if REPLAY or not args.no_record else None
+
+    os.makedirs(OUT_DIR, exist_ok=True)
+
+    catalog = as_catalog(data, SITES_JSON, LIGHT_FIELDS)
+    sites = catalog.sites
+    add_host_slots(catalog)
+    now = datetime.now(timezone.utc).isoformat()
+    state = None if REPLAY else load_state(STATE_JSON)
+    manifest = load_manifest()
+    for slug in [slug for slug in manifest if slug not in catalog]:
+        del manifest[slug]
+
+    if state and not args.force:
+        due = [s for s in sites if state.is_due(s.get("slug"), slack=SCHEDULE_SLACK)]
+        print(f"{len(due)} of {len(sites)} sites due")
+        sites = due
+    if state:
+        # The executor starts them in submission order
+        sites = sorted(sites, key=lambda s: state.priority(s.get("slug")), reverse=True)
+    elif REPLAY:
+        # A site with nothing stored would be rewritten empty
+        stored = _store.urls()
+        sites = [s for s in sites if stored & {*best_site_feed(s.get("url"), s.get("rss")), s.get("mastodon_rss")}]
+        print(f"Replaying {len(sites)} sites")
+
+    metrics = FetchMetrics("update_feeds")
+    ok = 0
+    unchanged = 0
+    skipped = 0
+    changed_sites: List[Dict[str, Any]] = []
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as pool:
+        futures = {
+            pool.submit(update_site, s, now, state, (manifest.get(s.get("slug")) or {}).get("hash"), metrics,
+                        deadline): s
+            for s in sites
+        }
+        for fut in as_completed(futures):
+            site = futures[fut]
+            slug = site.get("slug")
+            try:
+                digest = fut.result()
+            except Exception as e:
+                print(f"  ! {slug}: {e}")
+                continue
+            if digest is SKIPPED:
+                skipped += 1
+                continue
+            if digest and digest != (manifest.get(slug) or {}).get("hash"):
+                manifest[slug] = {"hash": digest, "changed_at": now}
+                changed_sites.append(site)
+                ok += 1
+            else:
+                unchanged += 1
 
-    print(f"Updated {ok} feeds at {now}")
+    if skipped:
+        print(f"Time budget of {args.time_budget:g}s spent: {skipped} sites left for the next run")
+    save_manifest(manifest)
+    if state:
+        state.save()
+        metrics.write()
+    if _store is not None:
+        if not REPLAY:
+            _store.prune()
+        _store.close()
+    archived = 0
+    if args.archive:
+        fresh = not os.path.exists(args.archive)
+        with Archive(args.archive) as archive:
+            # A new archive starts from everything already in the cache
+            for s in catalog.sites if fresh else changed_sites:
+                archived += archive.add_feed(s, load_previous(s.get("slug")) or {}, now)
+            bundles = write_latest(catalog.sites, archive)
+    else:
+        bundles = write_latest(catalog.sites)
+    print(f"Updated {ok} feeds ({unchanged} unchanged), {bundles} latest bundles, {archived} items archived at {now}")
     return 0
 
 if __name__ == "__main__":